@@ -4,21 +4,37 @@ Simple API Server for Taxi Passenger Counting System (Docker Version)
 This version runs without computer vision dependencies for Docker deployment.
 """
 
+import asyncio
+import itertools
 import os
 import sys
 import json
 import yaml
 import logging
+import time
+from collections import deque
+from functools import lru_cache
 from datetime import datetime
 from typing import Dict, List, Optional
 from pathlib import Path
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse, JSONResponse
-from pydantic import BaseModel
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import StreamingResponse, ORJSONResponse, Response
+from pydantic import BaseModel, ConfigDict
 import uvicorn
 
+try:
+    import aiofiles
+except ImportError:  # aiofiles is optional; /config falls back to a blocking read
+    aiofiles = None
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # Redis is optional; state stays in process memory without it
+    aioredis = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -28,11 +44,15 @@ logger = logging.getLogger(__name__)
 
 # Pydantic models
 class PassengerCount(BaseModel):
+    model_config = ConfigDict(extra='ignore')
+
     count: int
     timestamp: str
     vehicle_id: str
 
 class TripData(BaseModel):
+    model_config = ConfigDict(extra='ignore')
+
     trip_id: str
     start_time: str
     end_time: Optional[str] = None
@@ -40,6 +60,9 @@ class TripData(BaseModel):
     vehicle_id: str
 
 class SystemStatus(BaseModel):
+    # Response-only, never mutated after construction
+    model_config = ConfigDict(extra='ignore', frozen=True)
+
     status: str
     vehicle_id: str
     camera_connected: bool
@@ -50,7 +73,8 @@ class SystemStatus(BaseModel):
 app = FastAPI(
     title="Taxi Passenger Counting API",
     description="API for HDJ864L Taxi Passenger Counting System",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -62,10 +86,51 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger JSON bodies (trip lists, mobile payloads, config) for mobile links
+app.add_middleware(GZipMiddleware, minimum_size=500, compresslevel=5)
+
+class TimingMiddleware:
+    """
+    Pure ASGI middleware that reports handler time in a Server-Timing header.
+
+    New middleware should follow this shape (a plain ASGI callable wrapping
+    `app`) instead of subclassing BaseHTTPMiddleware, which runs every
+    request through an extra task and re-streams the response body.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                duration_ms = (time.perf_counter() - start) * 1000
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"server-timing", f"app;dur={duration_ms:.1f}".encode())
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_timing)
+
+app.add_middleware(TimingMiddleware)
+
 # Global variables
 VEHICLE_ID = os.getenv("VEHICLE_REGISTRATION", "HDJ864L")
+# With REDIS_URL set, passenger count and trips are shared by every worker;
+# otherwise they live in the globals below and need a single worker
+REDIS_URL = os.getenv("REDIS_URL")
+PASSENGER_COUNT_KEY = f"pax:{VEHICLE_ID}"
+TRIPS_KEY = f"trips:{VEHICLE_ID}"
 current_passenger_count = 0
-trip_data = []
+# Only the most recent trips are kept, in memory or in Redis
+MAX_TRIPS = 10000
+trip_data = deque(maxlen=MAX_TRIPS)
 system_status = {
     "status": "running",
     "vehicle_id": VEHICLE_ID,
@@ -74,124 +139,301 @@ system_status = {
     "last_update": datetime.now().isoformat()
 }
 
+# Response timestamps, refreshed every 100 ms by clock_task instead of per request
+NOW = datetime.now()
+NOW_ISO = NOW.isoformat()
+clock_task = None
+
+# Static response payloads, built once at import; handlers only add live fields
+CAMERA_IP = os.getenv("CAMERA_IP", "192.168.8.200")
+CAMERA_USERNAME = os.getenv("CAMERA_USERNAME", "admin")
+CAMERA_PASSWORD = os.getenv("CAMERA_PASSWORD", "Random336%23")
+CAMERA_STREAM_URL = f"rtsp://{CAMERA_USERNAME}:{CAMERA_PASSWORD}@{CAMERA_IP}:554/stream1"
+ROOT_RESPONSE = {
+    "message": f"Taxi Passenger Counting API for {VEHICLE_ID}",
+    "status": "running"
+}
+HEALTH_RESPONSE = {
+    "status": "healthy",
+    "vehicle_id": VEHICLE_ID
+}
+VEHICLE_SUMMARY = {
+    "id": VEHICLE_ID,
+    "registration": VEHICLE_ID,
+    "type": "taxi",
+    "status": "active",
+    "camera_connected": True
+}
+MOBILE_VEHICLE = {
+    "vehicle_id": VEHICLE_ID,
+    "registration_number": VEHICLE_ID,
+    "type": "mini_bus_taxi",
+    "status": "active",
+    "location": {
+        "latitude": -33.9249,  # Cape Town coordinates
+        "longitude": 18.4241,
+        "address": "Cape Town, South Africa"
+    },
+    "camera": {
+        "ip": CAMERA_IP,
+        "status": "connected",
+        "stream_url": CAMERA_STREAM_URL
+    },
+    "capacity": 14
+}
+DEFAULT_CONFIG = {
+    "vehicle": {
+        "registration": VEHICLE_ID,
+        "type": "taxi"
+    },
+    "camera": {
+        "ip": CAMERA_IP,
+        "type": "ip",
+        "stream_url": CAMERA_STREAM_URL
+    },
+    "processing": {
+        "model": "yolov8n.pt",
+        "confidence_threshold": 0.5
+    }
+}
+MOBILE_STREAM_INFO = {
+    "vehicle_id": VEHICLE_ID,
+    "stream_url": CAMERA_STREAM_URL,
+    "hls_url": f"http://100.69.8.80:8000/hls/{VEHICLE_ID}/playlist.m3u8",
+    "status": "active",
+    "resolution": "1920x1080",
+    "fps": 30,
+    "camera_ip": CAMERA_IP
+}
+
+# Decrement without going below zero, atomically on the Redis server
+DECREMENT_FLOORED = """
+local count = redis.call('DECR', KEYS[1])
+if count < 0 then
+    redis.call('SET', KEYS[1], 0)
+    count = 0
+end
+return count
+"""
+
+@lru_cache()
+def get_redis():
+    """Shared Redis client, or None when state is kept in process memory"""
+    if aioredis is None or not REDIS_URL:
+        return None
+    return aioredis.from_url(REDIS_URL, decode_responses=True)
+
+# In-flight Redis read shared by every concurrent read_passenger_count() caller
+pending_count_read: Optional[asyncio.Task] = None
+
+async def fetch_passenger_count(r) -> int:
+    """Read the passenger count from Redis"""
+    return int(await r.get(PASSENGER_COUNT_KEY) or 0)
+
+def clear_pending_count_read(task):
+    """Let the next caller start a fresh Redis read"""
+    global pending_count_read
+    if pending_count_read is task:
+        pending_count_read = None
+
+async def read_passenger_count() -> int:
+    """Current passenger count; concurrent callers share one Redis round trip"""
+    global pending_count_read
+    r = get_redis()
+    if r is None:
+        return current_passenger_count
+
+    if pending_count_read is None:
+        pending_count_read = asyncio.ensure_future(fetch_passenger_count(r))
+        pending_count_read.add_done_callback(clear_pending_count_read)
+    # shield: one disconnecting client must not cancel the read for the rest
+    return await asyncio.shield(pending_count_read)
+
+async def write_passenger_count(count: int) -> int:
+    """Set the passenger count"""
+    global current_passenger_count
+    r = get_redis()
+    if r is None:
+        current_passenger_count = count
+    else:
+        await r.set(PASSENGER_COUNT_KEY, count)
+    return count
+
+async def change_passenger_count(delta: int) -> int:
+    """Add delta (+1/-1) to the passenger count, never going below zero"""
+    global current_passenger_count
+    r = get_redis()
+    if r is None:
+        current_passenger_count = max(current_passenger_count + delta, 0)
+        return current_passenger_count
+    if delta > 0:
+        return await r.incrby(PASSENGER_COUNT_KEY, delta)
+    return int(await r.eval(DECREMENT_FLOORED, 1, PASSENGER_COUNT_KEY))
+
+async def tick_now():
+    """Refresh the shared NOW / NOW_ISO timestamps every 100 ms"""
+    global NOW, NOW_ISO
+    while True:
+        NOW = datetime.now()
+        NOW_ISO = NOW.isoformat()
+        await asyncio.sleep(0.1)
+
+@app.on_event("startup")
+async def startup_event():
+    """Start the timestamp clock"""
+    global clock_task
+    clock_task = asyncio.create_task(tick_now())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the timestamp clock"""
+    if clock_task:
+        clock_task.cancel()
+
 @app.get("/")
 async def root():
     """Root endpoint"""
-    return {
-        "message": f"Taxi Passenger Counting API for {VEHICLE_ID}",
-        "status": "running",
-        "timestamp": datetime.now().isoformat()
-    }
+    return {**ROOT_RESPONSE, "timestamp": NOW}
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "vehicle_id": VEHICLE_ID,
-        "timestamp": datetime.now().isoformat()
-    }
+    return {**HEALTH_RESPONSE, "timestamp": NOW}
 
 @app.get("/status", response_model=SystemStatus)
 async def get_system_status():
     """Get current system status"""
-    system_status["last_update"] = datetime.now().isoformat()
+    system_status["last_update"] = NOW_ISO
     return SystemStatus(**system_status)
 
 @app.get("/passenger-count", response_model=PassengerCount)
 async def get_passenger_count():
     """Get current passenger count"""
     return PassengerCount(
-        count=current_passenger_count,
-        timestamp=datetime.now().isoformat(),
+        count=await read_passenger_count(),
+        timestamp=NOW_ISO,
         vehicle_id=VEHICLE_ID
     )
 
 @app.post("/passenger-count")
 async def update_passenger_count(count_data: PassengerCount):
     """Update passenger count (for external updates)"""
-    global current_passenger_count
-    current_passenger_count = count_data.count
-    logger.info(f"Passenger count updated to: {current_passenger_count}")
-    return {"message": "Passenger count updated", "count": current_passenger_count}
+    count = await write_passenger_count(count_data.count)
+    logger.info(f"Passenger count updated to: {count}")
+    return ORJSONResponse({"message": "Passenger count updated", "count": count})
 
 @app.get("/trips", response_model=List[TripData])
-async def get_trips():
-    """Get all trip data"""
-    return trip_data
+async def get_trips(response: Response, limit: int = Query(100, ge=1, le=1000), offset: int = Query(0, ge=0)):
+    """Get a page of trip data (oldest first); X-Total-Count holds the total"""
+    r = get_redis()
+    if r is None:
+        response.headers["X-Total-Count"] = str(len(trip_data))
+        return list(itertools.islice(trip_data, offset, offset + limit))
+
+    response.headers["X-Total-Count"] = str(await r.llen(TRIPS_KEY))
+    trips = await r.lrange(TRIPS_KEY, offset, offset + limit - 1)
+    return [TripData.model_validate_json(trip) for trip in trips]
+
+async def persist_trip(trip: TripData):
+    """Store a trip (runs as a background task after the response is sent)"""
+    r = get_redis()
+    try:
+        if r is None:
+            trip_data.append(trip)
+        else:
+            async with r.pipeline(transaction=True) as pipe:
+                pipe.rpush(TRIPS_KEY, trip.model_dump_json())
+                pipe.ltrim(TRIPS_KEY, -MAX_TRIPS, -1)
+                await pipe.execute()
+        logger.info(f"New trip created: {trip.trip_id}")
+    except Exception as e:
+        logger.error(f"Error storing trip {trip.trip_id}: {e}")
 
 @app.post("/trips")
-async def create_trip(trip: TripData):
+async def create_trip(trip: TripData, background_tasks: BackgroundTasks):
     """Create a new trip"""
-    trip_data.append(trip)
-    logger.info(f"New trip created: {trip.trip_id}")
-    return {"message": "Trip created", "trip_id": trip.trip_id}
+    background_tasks.add_task(persist_trip, trip)
+    return ORJSONResponse({"message": "Trip created", "trip_id": trip.trip_id})
+
+# libyaml's C loader when PyYAML was built with it
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Parsed YAML files by path, as (mtime_ns, data); a changed mtime forces a re-read
+yaml_cache: Dict[str, tuple] = {}
+
+async def load_yaml_cached(path: str, mtime_ns: int) -> dict:
+    """Parse a YAML file, re-reading it only when its mtime changes"""
+    cached = yaml_cache.get(path)
+    if cached and cached[0] == mtime_ns:
+        return cached[1]
+
+    if aiofiles is not None:
+        async with aiofiles.open(path, 'r') as f:
+            text = await f.read()
+    else:
+        with open(path, 'r') as f:
+            text = f.read()
+
+    data = yaml.load(text, Loader=YAML_LOADER)
+    yaml_cache[path] = (mtime_ns, data)
+    return data
 
 @app.get("/config")
-async def get_config():
+async def get_config(request: Request):
     """Get system configuration"""
     config_path = Path("config/HDJ864L_live.yaml")
     if config_path.exists():
         try:
-            with open(config_path, 'r') as f:
-                config = yaml.safe_load(f)
-            return config
+            mtime_ns = config_path.stat().st_mtime_ns
+            headers = {"ETag": f'"{mtime_ns:x}"', "Cache-Control": "max-age=60"}
+            if request.headers.get("if-none-match") == headers["ETag"]:
+                return Response(status_code=304, headers=headers)
+
+            config = await load_yaml_cached(str(config_path), mtime_ns)
+            return ORJSONResponse(config, headers=headers)
         except Exception as e:
             logger.error(f"Error reading config: {e}")
             raise HTTPException(status_code=500, detail="Error reading configuration")
     else:
-        return {
-            "vehicle": {
-                "registration": VEHICLE_ID,
-                "type": "taxi"
-            },
-            "camera": {
-                "ip": os.getenv("CAMERA_IP", "192.168.8.200"),
-                "type": "ip",
-                "stream_url": f"rtsp://{os.getenv('CAMERA_USERNAME', 'admin')}:{os.getenv('CAMERA_PASSWORD', 'Random336%23')}@{os.getenv('CAMERA_IP', '192.168.8.200')}:554/stream1"
-            },
-            "processing": {
-                "model": "yolov8n.pt",
-                "confidence_threshold": 0.5
-            }
-        }
+        return DEFAULT_CONFIG
 
 @app.post("/simulate/passenger-entry")
 async def simulate_passenger_entry():
     """Simulate a passenger entering (for testing)"""
-    global current_passenger_count
-    current_passenger_count += 1
-    logger.info(f"Simulated passenger entry. Count: {current_passenger_count}")
-    return {
+    count = await change_passenger_count(1)
+    logger.info(f"Simulated passenger entry. Count: {count}")
+    return ORJSONResponse({
         "message": "Passenger entry simulated",
-        "count": current_passenger_count,
-        "timestamp": datetime.now().isoformat()
-    }
+        "count": count,
+        "timestamp": NOW
+    })
 
 @app.post("/simulate/passenger-exit")
 async def simulate_passenger_exit():
     """Simulate a passenger exiting (for testing)"""
-    global current_passenger_count
-    if current_passenger_count > 0:
-        current_passenger_count -= 1
-    logger.info(f"Simulated passenger exit. Count: {current_passenger_count}")
-    return {
+    count = await change_passenger_count(-1)
+    logger.info(f"Simulated passenger exit. Count: {count}")
+    return ORJSONResponse({
         "message": "Passenger exit simulated",
-        "count": current_passenger_count,
-        "timestamp": datetime.now().isoformat()
-    }
+        "count": count,
+        "timestamp": NOW
+    })
 
 @app.post("/reset")
 async def reset_system():
     """Reset passenger count and trip data"""
-    global current_passenger_count, trip_data
-    current_passenger_count = 0
-    trip_data = []
+    global current_passenger_count
+    r = get_redis()
+    if r is None:
+        current_passenger_count = 0
+        trip_data.clear()
+    else:
+        await r.delete(PASSENGER_COUNT_KEY, TRIPS_KEY)
     logger.info("System reset completed")
-    return {
+    return ORJSONResponse({
         "message": "System reset completed",
-        "timestamp": datetime.now().isoformat()
-    }
+        "timestamp": NOW
+    })
 
 # Footage streaming endpoints
 @app.get("/api/v1/footage/{vehicle_id}/live")
@@ -201,14 +443,14 @@ async def get_live_footage(vehicle_id: str):
 
     # For Docker deployment, return a placeholder response
     # In production, this would stream actual camera footage
-    return JSONResponse({
+    return {
         "message": f"Live footage endpoint for {vehicle_id}",
         "status": "simulated",
         "vehicle_id": vehicle_id,
-        "stream_url": f"rtsp://{os.getenv('CAMERA_USERNAME', 'admin')}:{os.getenv('CAMERA_PASSWORD', 'Random336%23')}@{os.getenv('CAMERA_IP', '192.168.8.200')}:554/stream1",
+        "stream_url": CAMERA_STREAM_URL,
         "note": "This is a simulated response. In production, this would stream live camera footage.",
-        "timestamp": datetime.now().isoformat()
-    })
+        "timestamp": NOW
+    }
 
 @app.get("/api/v1/footage/{vehicle_id}/status")
 async def get_footage_status(vehicle_id: str):
@@ -219,55 +461,33 @@ async def get_footage_status(vehicle_id: str):
         "streaming": vehicle_id == VEHICLE_ID,
         "resolution": "2304x1296" if vehicle_id == VEHICLE_ID else "unknown",
         "fps": 25 if vehicle_id == VEHICLE_ID else 0,
-        "timestamp": datetime.now().isoformat()
+        "timestamp": NOW
     }
 
 @app.get("/api/v1/vehicles")
 async def list_vehicles():
     """List all available vehicles"""
     return {
-        "vehicles": [
-            {
-                "id": VEHICLE_ID,
-                "registration": VEHICLE_ID,
-                "type": "taxi",
-                "status": "active",
-                "camera_connected": True,
-                "last_seen": datetime.now().isoformat()
-            }
-        ],
+        "vehicles": [{**VEHICLE_SUMMARY, "last_seen": NOW}],
         "total": 1
     }
 
 @app.get("/mobile/vehicles")
 async def mobile_list_vehicles():
     """Mobile API: List all available vehicles"""
+    count = await read_passenger_count()
     return {
         "vehicles": [
             {
-                "vehicle_id": VEHICLE_ID,
-                "registration_number": VEHICLE_ID,
-                "type": "mini_bus_taxi",
-                "status": "active",
-                "location": {
-                    "latitude": -33.9249,  # Cape Town coordinates
-                    "longitude": 18.4241,
-                    "address": "Cape Town, South Africa"
-                },
-                "camera": {
-                    "ip": os.getenv("CAMERA_IP", "192.168.8.200"),
-                    "status": "connected",
-                    "stream_url": f"rtsp://{os.getenv('CAMERA_USERNAME', 'admin')}:{os.getenv('CAMERA_PASSWORD', 'Random336%23')}@{os.getenv('CAMERA_IP', '192.168.8.200')}:554/stream1"
-                },
-                "passenger_count": current_passenger_count,
-                "capacity": 14,
-                "last_update": datetime.now().isoformat(),
-                "trip_status": "in_progress" if current_passenger_count > 0 else "waiting"
+                **MOBILE_VEHICLE,
+                "passenger_count": count,
+                "last_update": NOW,
+                "trip_status": "in_progress" if count > 0 else "waiting"
             }
         ],
         "total_vehicles": 1,
         "active_vehicles": 1,
-        "timestamp": datetime.now().isoformat()
+        "timestamp": NOW
     }
 
 @app.get("/mobile/vehicle/{vehicle_id}")
@@ -276,30 +496,17 @@ async def mobile_get_vehicle(vehicle_id: str):
     if vehicle_id != VEHICLE_ID:
         raise HTTPException(status_code=404, detail="Vehicle not found")
     
+    count = await read_passenger_count()
     return {
-        "vehicle_id": VEHICLE_ID,
-        "registration_number": VEHICLE_ID,
-        "type": "mini_bus_taxi",
-        "status": "active",
-        "location": {
-            "latitude": -33.9249,
-            "longitude": 18.4241,
-            "address": "Cape Town, South Africa"
-        },
-        "camera": {
-            "ip": os.getenv("CAMERA_IP", "192.168.8.200"),
-            "status": "connected",
-            "stream_url": f"rtsp://{os.getenv('CAMERA_USERNAME', 'admin')}:{os.getenv('CAMERA_PASSWORD', 'Random336%23')}@{os.getenv('CAMERA_IP', '192.168.8.200')}:554/stream1"
-        },
-        "passenger_count": current_passenger_count,
-        "capacity": 14,
+        **MOBILE_VEHICLE,
+        "passenger_count": count,
         "current_trip": {
-            "trip_id": f"trip_{VEHICLE_ID}_{datetime.now().strftime('%Y%m%d_%H%M')}",
-            "start_time": datetime.now().isoformat(),
-            "status": "in_progress" if current_passenger_count > 0 else "waiting",
-            "passenger_count": current_passenger_count
+            "trip_id": f"trip_{VEHICLE_ID}_{NOW.strftime('%Y%m%d_%H%M')}",
+            "start_time": NOW,
+            "status": "in_progress" if count > 0 else "waiting",
+            "passenger_count": count
         },
-        "last_update": datetime.now().isoformat()
+        "last_update": NOW
     }
 
 @app.get("/mobile/vehicle/{vehicle_id}/stream/info")
@@ -308,25 +515,24 @@ async def mobile_get_stream_info(vehicle_id: str):
     if vehicle_id != VEHICLE_ID:
         raise HTTPException(status_code=404, detail="Vehicle not found")
     
-    return {
-        "vehicle_id": vehicle_id,
-        "stream_url": f"rtsp://{os.getenv('CAMERA_USERNAME', 'admin')}:{os.getenv('CAMERA_PASSWORD', 'Random336%23')}@{os.getenv('CAMERA_IP', '192.168.8.200')}:554/stream1",
-        "hls_url": f"http://100.69.8.80:8000/hls/{vehicle_id}/playlist.m3u8",
-        "status": "active",
-        "resolution": "1920x1080",
-        "fps": 30,
-        "camera_ip": os.getenv("CAMERA_IP", "192.168.8.200"),
-        "timestamp": datetime.now().isoformat()
-    }
+    return {**MOBILE_STREAM_INFO, "timestamp": NOW}
 
 if __name__ == "__main__":
     logger.info(f"Starting Taxi API Server for vehicle: {VEHICLE_ID}")
-    logger.info(f"Camera IP: {os.getenv('CAMERA_IP', '192.168.8.200')}")
+    logger.info(f"Camera IP: {CAMERA_IP}")
     
-    # Run the server
+    # Run the server on uvloop + httptools (both ship with uvicorn[standard]).
+    # Without Redis the passenger count and trips live in process memory, so
+    # extra workers would each see their own copy.
+    default_workers = (os.cpu_count() or 2) if get_redis() is not None else 1
     uvicorn.run(
-        app,
+        "api_server_simple:app",
         host="0.0.0.0",
         port=8000,
+        workers=int(os.getenv("UVICORN_WORKERS", default_workers)),
+        loop="uvloop",
+        http="httptools",
+        limit_concurrency=1000,
+        timeout_keep_alive=30,
         log_level="info"
     )
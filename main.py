@@ -16,19 +16,37 @@ Usage:
 import asyncio
 import argparse
 import logging
+import logging.handlers
+import queue
 import signal
 import sys
 import yaml
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as YamlLoader
+
+# Configure logging first. File writes go through a queue to a listener
+# thread, so a slow SD card never blocks the event loop.
+log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+file_handler = logging.FileHandler('logs/taxi_counter.log', mode='a')
+file_handler.setFormatter(log_formatter)
+log_queue = queue.SimpleQueue()
+log_listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+log_listener.start()
+# Pass records through unformatted; file_handler applies the real format
+queue_handler = logging.handlers.QueueHandler(log_queue)
+queue_handler.setFormatter(logging.Formatter('%(message)s'))
 
-# Configure logging first
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     handlers=[
         logging.StreamHandler(sys.stdout),
-        logging.FileHandler('logs/taxi_counter.log', mode='a')
+        queue_handler
     ]
 )
 
@@ -59,6 +77,10 @@ class TaxiCounterApplication:
         self.passenger_counter = None
         self.anti_fraud_manager = None
 
+        # Passenger events are handed from the counter thread to the main loop
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._event_queue: Optional[asyncio.Queue] = None
+
         # Setup signal handlers for graceful shutdown
         signal.signal(signal.SIGINT, self._signal_handler)
         signal.signal(signal.SIGTERM, self._signal_handler)
@@ -78,7 +100,7 @@ class TaxiCounterApplication:
                 return self._create_default_config()
 
             with open(config_file, 'r') as f:
-                config = yaml.safe_load(f)
+                config = yaml.load(f, Loader=YamlLoader)
 
             logger.info(f"Configuration loaded from {self.config_path}")
             return config
@@ -180,6 +202,9 @@ class TaxiCounterApplication:
 
             logger.info("Starting Taxi Counter Application...")
 
+            self._loop = asyncio.get_running_loop()
+            self._event_queue = asyncio.Queue()
+
             # Start passenger counter
             if not self.passenger_counter.start():
                 logger.error("Failed to start passenger counter")
@@ -198,22 +223,31 @@ class TaxiCounterApplication:
             return False
 
     async def _main_loop(self):
-        """Main application loop."""
+        """
+        Main application loop.
+
+        Blocks until the counter reports a passenger event; if none arrives
+        within the heartbeat interval, the status is logged anyway.
+        """
         logger.info("Entering main application loop...")
 
         try:
             while self.is_running:
-                # Get current statistics
-                stats = self.passenger_counter.get_statistics()
+                try:
+                    event = await asyncio.wait_for(self._event_queue.get(), timeout=30)
+                except asyncio.TimeoutError:
+                    event = None
+
+                # None is a heartbeat timeout or the shutdown wake-up
+                if event is not None:
+                    self._handle_passenger_event(event)
 
-                # Log status periodically
+                # Log status after every event and on each heartbeat
+                stats = self.passenger_counter.get_statistics()
                 if stats.get("processing_fps", 0) > 0:
                     logger.debug(f"Status - Count: {stats['current_passengers']}, "
                                f"FPS: {stats['processing_fps']:.1f}")
 
-                # Sleep to prevent busy waiting
-                await asyncio.sleep(5)
-
         except Exception as e:
             logger.error(f"Error in main loop: {e}")
         finally:
@@ -221,7 +255,17 @@ class TaxiCounterApplication:
 
     def _on_passenger_event(self, event):
         """
-        Handle passenger events from the counter.
+        Queue passenger events from the counter's processing thread.
+
+        Args:
+            event: Passenger event object
+        """
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._event_queue.put_nowait, event)
+
+    def _handle_passenger_event(self, event):
+        """
+        Handle a passenger event on the main loop.
 
         Args:
             event: Passenger event object
@@ -239,6 +283,10 @@ class TaxiCounterApplication:
         logger.info("Shutting down application...")
         self.is_running = False
 
+        # Wake the main loop so it notices is_running without waiting for a heartbeat
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._event_queue.put_nowait, None)
+
         if self.passenger_counter:
             self.passenger_counter.stop()
 
@@ -329,4 +377,8 @@ if __name__ == "__main__":
     Path("logs").mkdir(exist_ok=True)
 
     # Run the application
-    asyncio.run(main())
+    try:
+        asyncio.run(main())
+    finally:
+        # Flush queued log records to the file before exiting
+        log_listener.stop()
@@ -0,0 +1,14 @@
+"""
+Script Path Bootstrap
+
+Puts the project's src/ directory first on sys.path so scripts can import
+the application packages. Import it before any of those packages.
+"""
+
+import os
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
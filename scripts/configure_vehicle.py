@@ -10,11 +10,16 @@ import argparse
 import yaml
 import json
 import logging
+import secrets
 import sys
-import uuid
 from pathlib import Path
 from datetime import datetime
 
+try:
+    from yaml import CSafeDumper as YamlDumper
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeDumper as YamlDumper
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -24,7 +29,7 @@ def create_vehicle_config(registration_number, camera_url, camera_username=None,
     """Create vehicle configuration."""
 
     # Generate unique device ID
-    device_id = f"rpi_{registration_number.lower()}_{uuid.uuid4().hex[:8]}"
+    device_id = f"rpi_{registration_number.lower()}_{secrets.token_hex(4)}"
 
     config = {
         "vehicle": {
@@ -131,14 +136,19 @@ def save_config(config, output_path):
     output_file.parent.mkdir(parents=True, exist_ok=True)
 
     with open(output_file, 'w') as f:
-        yaml.dump(config, f, default_flow_style=False, indent=2)
+        yaml.dump(config, f, Dumper=YamlDumper, default_flow_style=False, indent=2)
 
     logger.info(f"Configuration saved to: {output_file}")
 
 
-def register_vehicle_with_backend(config, api_endpoint, api_key):
-    """Register vehicle with backend API."""
-    import requests
+def register_vehicle_with_backend(config, api_endpoint, api_key, client=None):
+    """Register vehicle with backend API.
+
+    Pass a shared httpx.Client to reuse its connection when registering
+    several vehicles; otherwise a one-off client is opened and closed here.
+    """
+    import httpx
+    from importlib.util import find_spec
 
     vehicle_data = {
         "registration_number": config["vehicle"]["registration_number"],
@@ -162,12 +172,16 @@ def register_vehicle_with_backend(config, api_endpoint, api_key):
         "Authorization": f"Bearer {api_key}"
     }
 
+    owns_client = client is None
+    if owns_client:
+        # HTTP/2 needs the optional h2 package (httpx[http2])
+        client = httpx.Client(http2=find_spec("h2") is not None, timeout=30)
+
     try:
-        response = requests.post(
+        response = client.post(
             f"{api_endpoint}/api/v1/vehicles",
             json=vehicle_data,
-            headers=headers,
-            timeout=30
+            headers=headers
         )
 
         if response.status_code == 201:
@@ -181,6 +195,10 @@ def register_vehicle_with_backend(config, api_endpoint, api_key):
         logger.error(f"✗ Error registering vehicle: {e}")
         return None
 
+    finally:
+        if owns_client:
+            client.close()
+
 
 def main():
     parser = argparse.ArgumentParser(description="Configure vehicle for taxi counting system")
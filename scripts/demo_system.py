@@ -9,24 +9,13 @@ with simulated data and realistic scenarios.
 import sys
 import time
 import json
-from pathlib import Path
-from datetime import datetime, timedelta
-import random
+from datetime import datetime, timedelta, timezone
+import numpy as np
 
 # Add src to path
-sys.path.append(str(Path(__file__).parent.parent / "src"))
-
-# Import vehicle models directly to avoid OpenCV dependency
-import importlib.util
-models_path = Path(__file__).parent.parent / "src" / "vehicle_management" / "models.py"
-spec = importlib.util.spec_from_file_location("vehicle_models", models_path)
-vehicle_models = importlib.util.module_from_spec(spec)
-spec.loader.exec_module(vehicle_models)
-
-Vehicle = vehicle_models.Vehicle
-CameraType = vehicle_models.CameraType
-FootageRecord = vehicle_models.FootageRecord
+import _bootstrap  # noqa: F401
 
+from vehicle_management.models import Vehicle, CameraType, FootageRecord
 from trip_management.models import Trip, EventType
 from live_streaming.models import StreamConfig, StreamSession, StreamQuality
 
@@ -94,7 +83,11 @@ def simulate_taxi_trip():
         (0, "Trip completed - all passengers off")
     ]
 
-    for count, description in boarding_events:
+    # Draw every detection confidence at once; events are 0.5s apart
+    confidences = np.random.default_rng().uniform(0.85, 0.98, len(boarding_events))
+    base_time = datetime.now(timezone.utc)
+
+    for i, (count, description) in enumerate(boarding_events):
         # Update passenger count
         trip.update_passenger_count(count)
 
@@ -102,9 +95,9 @@ def simulate_taxi_trip():
         event_type = EventType.PASSENGER_ENTRY if count > trip.current_passenger_count else EventType.PASSENGER_EXIT
         trip.add_event(event_type, {
             "passenger_count": count,
-            "confidence": random.uniform(0.85, 0.98),
+            "confidence": float(confidences[i]),
             "description": description,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": base_time + timedelta(milliseconds=500 * i)
         })
 
         # Display status
@@ -114,12 +107,13 @@ def simulate_taxi_trip():
         # Simulate time passing
         time.sleep(0.5)
 
-    # End trip
+    # End trip and serialize its events in one batch
     trip.end_trip()
+    events_json = trip.serialize_events()
 
     print_section("Trip Summary")
     print(f"Trip Duration: {trip.get_duration_minutes():.1f} minutes")
-    print(f"Total Events: {len(trip.events)}")
+    print(f"Total Events: {len(trip.events)} ({len(events_json):,} bytes as JSON)")
     print(f"Overload Detected: {'Yes' if trip.is_overloaded else 'No'}")
     print(f"Final Status: {trip.status.value}")
 
@@ -4,7 +4,10 @@ Remote Update Manager for Taxi Streaming System
 Handles git-based updates with minimal downtime
 """
 
+import hashlib
 import os
+import select
+import shutil
 import sys
 import subprocess
 import time
@@ -13,6 +16,21 @@ import logging
 from pathlib import Path
 from typing import Optional
 
+try:
+    import fcntl
+except ImportError:  # not available on Windows; backups fall back to copies
+    fcntl = None
+
+try:
+    from dulwich import porcelain
+    from dulwich.errors import NotGitRepository
+    from dulwich.repo import Repo
+except ImportError:  # fall back to the git CLI
+    porcelain = None
+
+# ioctl that makes dst share src's data blocks (btrfs, XFS); see ioctl_ficlone(2)
+FICLONE = 0x40049409
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -20,17 +38,81 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def clone_file(src: str, dst: str) -> str:
+    """Copy a file without duplicating its bytes where the filesystem allows.
+
+    Tries a copy-on-write reflink and falls back to a regular copy. Hardlinks
+    are not an option: config files are rewritten in place, which would
+    change the backup too.
+    """
+    if fcntl is not None:
+        try:
+            with open(src, "rb") as src_file, open(dst, "wb") as dst_file:
+                fcntl.ioctl(dst_file.fileno(), FICLONE, src_file.fileno())
+            shutil.copystat(src, dst)
+            return dst
+        except OSError:
+            if os.path.exists(dst):
+                os.unlink(dst)
+
+    return shutil.copy2(src, dst)
+
+def open_trigger_fifo(path: str) -> int:
+    """Create the webhook trigger FIFO if needed and open it without blocking"""
+    if not os.path.exists(path):
+        os.mkfifo(path, 0o600)
+    # O_RDWR keeps a writer attached, so select() never sees EOF between triggers
+    return os.open(path, os.O_RDWR | os.O_NONBLOCK)
+
+def wait_for_trigger(fifo_fd: int, timeout: float) -> bool:
+    """Block until api_server.py forwards a webhook or the timeout passes"""
+    ready, _, _ = select.select([fifo_fd], [], [], timeout)
+    if not ready:
+        return False
+    # Drain so several pushes in a row cause a single update check
+    try:
+        while os.read(fifo_fd, 4096):
+            pass
+    except BlockingIOError:
+        pass
+    return True
+
 class RemoteUpdater:
     def __init__(self, repo_url: str, branch: str = "main"):
         self.repo_url = repo_url
         self.branch = branch
         self.app_dir = Path("/app")
         self.service_url = "http://localhost:8000"
+
+        # One keep-alive connection to the local service for health probes
+        self._session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=1)
+        self._session.mount("http://", adapter)
+
+        # Keep the repository open in-process instead of forking git per call
+        self._repo = None
+        if porcelain is not None:
+            try:
+                self._repo = Repo(str(self.app_dir))
+            except NotGitRepository:
+                logger.warning(f"⚠️ {self.app_dir} is not a git repository")
+
+    def close(self):
+        """Close the health check session and repository"""
+        self._session.close()
+        if self._repo is not None:
+            self._repo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
         
     def check_service_health(self) -> bool:
         """Check if the service is running"""
         try:
-            response = requests.get(f"{self.service_url}/health", timeout=5)
+            response = self._session.head(f"{self.service_url}/health", timeout=5)
             return response.status_code == 200
         except:
             return False
@@ -38,6 +120,8 @@ class RemoteUpdater:
     def get_current_commit(self) -> Optional[str]:
         """Get current git commit hash"""
         try:
+            if self._repo is not None:
+                return self._repo.head().decode()
             result = subprocess.run(
                 ["git", "rev-parse", "HEAD"],
                 cwd=self.app_dir,
@@ -51,14 +135,21 @@ class RemoteUpdater:
     def get_remote_commit(self) -> Optional[str]:
         """Get remote git commit hash"""
         try:
-            subprocess.run(["git", "fetch", "origin"], cwd=self.app_dir, check=True)
+            # Only asks for the branch tip; objects are fetched by git pull
+            # once an update is actually needed
+            if self._repo is not None:
+                refs = porcelain.ls_remote(self.repo_url)
+                tip = refs.get(f"refs/heads/{self.branch}".encode())
+                return tip.decode() if tip else None
             result = subprocess.run(
-                ["git", "rev-parse", f"origin/{self.branch}"],
+                ["git", "ls-remote", "--heads", "origin", self.branch],
                 cwd=self.app_dir,
                 capture_output=True,
                 text=True
             )
-            return result.stdout.strip() if result.returncode == 0 else None
+            if result.returncode != 0 or not result.stdout.strip():
+                return None
+            return result.stdout.split()[0]
         except:
             return None
     
@@ -73,10 +164,11 @@ class RemoteUpdater:
             for file_path in critical_files:
                 source = self.app_dir / file_path
                 if source.exists():
+                    target = backup_dir / source.name
                     if source.is_dir():
-                        subprocess.run(["cp", "-r", str(source), str(backup_dir)], check=True)
+                        shutil.copytree(source, target, copy_function=clone_file, dirs_exist_ok=True)
                     else:
-                        subprocess.run(["cp", str(source), str(backup_dir)], check=True)
+                        clone_file(str(source), str(target))
             
             logger.info(f"✅ Backup created: {backup_dir}")
             return True
@@ -88,22 +180,36 @@ class RemoteUpdater:
         """Pull latest code from git"""
         try:
             # Pull latest changes
-            result = subprocess.run(
-                ["git", "pull", "origin", self.branch],
-                cwd=self.app_dir,
-                capture_output=True,
-                text=True
-            )
-            
-            if result.returncode != 0:
-                logger.error(f"❌ Git pull failed: {result.stderr}")
-                return False
+            if self._repo is not None:
+                try:
+                    porcelain.pull(self._repo, self.repo_url, [f"refs/heads/{self.branch}".encode()])
+                except Exception as e:
+                    logger.error(f"❌ Git pull failed: {e}")
+                    return False
+            else:
+                result = subprocess.run(
+                    ["git", "pull", "origin", self.branch],
+                    cwd=self.app_dir,
+                    capture_output=True,
+                    text=True
+                )
+                
+                if result.returncode != 0:
+                    logger.error(f"❌ Git pull failed: {result.stderr}")
+                    return False
             
-            # Update dependencies
-            if (self.app_dir / "requirements.txt").exists():
-                subprocess.run([
-                    sys.executable, "-m", "pip", "install", "-r", "requirements.txt"
-                ], cwd=self.app_dir, check=True)
+            # Update dependencies, skipping pip when requirements.txt is unchanged
+            requirements = self.app_dir / "requirements.txt"
+            if requirements.exists():
+                req_hash = hashlib.sha256(requirements.read_bytes()).hexdigest()
+                hash_file = self.app_dir / ".req_hash"
+                if hash_file.exists() and hash_file.read_text().strip() == req_hash:
+                    logger.info("📦 Requirements unchanged, skipping pip install")
+                else:
+                    subprocess.run([
+                        sys.executable, "-m", "pip", "install", "-r", "requirements.txt"
+                    ], cwd=self.app_dir, check=True)
+                    hash_file.write_text(req_hash)
             
             logger.info("✅ Code updated successfully")
             return True
@@ -114,26 +220,70 @@ class RemoteUpdater:
     def restart_service(self) -> bool:
         """Restart the streaming service"""
         try:
-            # Kill existing process
-            subprocess.run(["pkill", "-f", "python.*api_server.py"], check=False)
-            time.sleep(2)
-            
-            # Start new process
-            subprocess.Popen([
-                sys.executable, "api_server.py"
-            ], cwd=self.app_dir)
-            
-            # Wait for service to start
-            for _ in range(30):  # Wait up to 30 seconds
-                time.sleep(1)
+            # A running server shuts down and re-execs itself on SIGHUP. The
+            # pattern is anchored so it cannot match api_server_simple.py.
+            result = subprocess.run(
+                ["pkill", "-HUP", "-f", r"python[^ ]* ([^ ]*/)?api_server\.py( |$)"],
+                check=False
+            )
+            if result.returncode == 0:
+                return self._wait_for_reload()
+            return self._start_service()
+        except Exception as e:
+            logger.error(f"❌ Restart failed: {e}")
+            return False
+
+    def _wait_for_reload(self) -> bool:
+        """Wait for the re-exec'd server to go down and answer again"""
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline and self.check_service_health():
+            time.sleep(0.1)
+        while time.monotonic() < deadline:
+            if self.check_service_health():
+                logger.info("✅ Service reloaded successfully")
+                return True
+            time.sleep(0.1)
+        
+        # A server from before SIGHUP handling was added is simply killed by
+        # the signal, so start a fresh one rather than leaving it down
+        logger.warning("⚠️ Service did not come back after reload, starting it")
+        return self._start_service()
+
+    def _start_service(self) -> bool:
+        """Start the streaming service when it is not running"""
+        try:
+            # Start new process; it writes to READY_FD once startup is done
+            read_fd, write_fd = os.pipe()
+            try:
+                try:
+                    subprocess.Popen([
+                        sys.executable, "api_server.py"
+                    ], cwd=self.app_dir, pass_fds=(write_fd,),
+                        env=dict(os.environ, READY_FD=str(write_fd)))
+                finally:
+                    os.close(write_fd)
+
+                # Wait up to 30 seconds; EOF means the process exited early
+                ready, _, _ = select.select([read_fd], [], [], 30.0)
+                signalled = bool(ready) and os.read(read_fd, 1) == b"1"
+            finally:
+                os.close(read_fd)
+
+            if ready and not signalled:
+                logger.error("❌ Service exited during startup")
+                return False
+
+            # Confirm over HTTP; the socket is bound right after startup completes
+            for _ in range(10):
                 if self.check_service_health():
                     logger.info("✅ Service restarted successfully")
                     return True
+                time.sleep(0.1)
             
             logger.error("❌ Service failed to start after restart")
             return False
         except Exception as e:
-            logger.error(f"❌ Restart failed: {e}")
+            logger.error(f"❌ Service start failed: {e}")
             return False
     
     def perform_update(self) -> bool:
@@ -175,23 +325,27 @@ class RemoteUpdater:
 def main():
     """Main update loop"""
     repo_url = os.getenv("GIT_REPO_URL", "")
-    update_interval = int(os.getenv("UPDATE_INTERVAL", "300"))  # 5 minutes default
+    # Pushes arrive through the webhook; the poll is only a safety net
+    update_interval = int(os.getenv("UPDATE_INTERVAL", "3600"))  # 1 hour default
+    trigger_fifo = os.getenv("UPDATE_TRIGGER_FIFO", "/tmp/taxitrack-update.fifo")
     
     if not repo_url:
         logger.error("❌ GIT_REPO_URL environment variable not set")
         sys.exit(1)
     
-    updater = RemoteUpdater(repo_url)
-    
-    logger.info(f"🚀 Remote updater started (checking every {update_interval}s)")
+    fifo_fd = open_trigger_fifo(trigger_fifo)
     
-    while True:
-        try:
-            updater.perform_update()
-        except Exception as e:
-            logger.error(f"❌ Update check failed: {e}")
+    with RemoteUpdater(repo_url) as updater:
+        logger.info(f"🚀 Remote updater started (webhook via {trigger_fifo}, polling every {update_interval}s)")
         
-        time.sleep(update_interval)
+        while True:
+            try:
+                updater.perform_update()
+            except Exception as e:
+                logger.error(f"❌ Update check failed: {e}")
+            
+            if wait_for_trigger(fifo_fd, update_interval):
+                logger.info("🔔 Update triggered by webhook")
 
 if __name__ == "__main__":
     main()
@@ -8,21 +8,45 @@ Validates configuration, imports, and core functionality.
 
 import sys
 import logging
-from pathlib import Path
+from datetime import datetime
 
 # Add src to path
-sys.path.append(str(Path(__file__).parent.parent / "src"))
+import _bootstrap  # noqa: F401
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Import everything up front; a failure is reported by the test that needs it
+import_errors = {}
+
+try:
+    from vehicle_management.models import Vehicle, CameraType, FootageRecord
+except ImportError as e:
+    import_errors["vehicle_management"] = e
+
+try:
+    from trip_management.models import Trip, EventType
+except ImportError as e:
+    import_errors["trip_management"] = e
+
+try:
+    from configure_vehicle import create_vehicle_config
+except ImportError as e:
+    import_errors["configure_vehicle"] = e
+
+
+def require(module_name):
+    """Re-raise the import error recorded for a module, if any."""
+    if module_name in import_errors:
+        raise import_errors[module_name]
+
 
 def test_vehicle_configuration():
     """Test vehicle configuration creation."""
     logger.info("Testing vehicle configuration...")
 
     try:
-        from vehicle_management.models import Vehicle, VehicleStatus, CameraType
+        require("vehicle_management")
 
         # Create test vehicle
         vehicle = Vehicle(
@@ -55,8 +79,7 @@ def test_footage_management():
     logger.info("Testing footage management...")
 
     try:
-        from vehicle_management.models import FootageRecord
-        from datetime import datetime
+        require("vehicle_management")
 
         # Create test footage record
         footage = FootageRecord(
@@ -87,7 +110,7 @@ def test_trip_models():
     logger.info("Testing trip models...")
 
     try:
-        from trip_management.models import Trip, TripStatus, EventType
+        require("trip_management")
 
         # Create test trip
         trip = Trip(
@@ -120,9 +143,7 @@ def test_configuration_script():
     logger.info("Testing configuration script...")
 
     try:
-        # Import the configuration function
-        sys.path.append(str(Path(__file__).parent))
-        from configure_vehicle import create_vehicle_config
+        require("configure_vehicle")
 
         # Create test configuration
         config = create_vehicle_config(
@@ -7,20 +7,57 @@ the taxi passenger counting system.
 """
 
 import cv2
+import numpy as np
 import argparse
+import concurrent.futures
+import errno
 import logging
+import os
+import re
+import selectors
+import shutil
+import subprocess
+import socket
+import threading
 import time
 import sys
+from collections import deque
 from pathlib import Path
 
-# Add src to path for imports
-sys.path.append(str(Path(__file__).parent.parent / "src"))
+# Add src to path
+import _bootstrap  # noqa: F401
 
 from computer_vision.camera_stream import CameraStream
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Preview width; frames are shown downscaled with their aspect ratio kept
+PREVIEW_WIDTH = 640
+# Text overlay area in the top-left corner and how often the counters are redrawn
+OVERLAY_SIZE = (90, 260)
+OVERLAY_REFRESH_SECONDS = 0.5
+# Wait between missed frames, doubling up to the cap; restart the camera after a run of misses
+INITIAL_BACKOFF = 0.05
+MAX_BACKOFF = 60.0
+MISSES_BEFORE_RESTART = 5
+
+# Non-blocking key check (OpenCV >= 4.5); older builds fall back to a 1 ms wait
+poll_key = getattr(cv2, "pollKey", None) or (lambda: cv2.waitKey(1))
+
+
+def render_overlay(static_overlay, fps, frame_count):
+    """Draw the FPS/frame counters onto a copy of the static overlay.
+
+    Returns the overlay and the mask of its text pixels.
+    """
+    overlay = static_overlay.copy()
+    cv2.putText(overlay, f"FPS: {fps:.1f}", (10, 20),
+               cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 1)
+    cv2.putText(overlay, f"Frames: {frame_count}", (10, 60),
+               cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 1)
+    return overlay, overlay.any(axis=2)
+
 
 def test_camera_connection(config):
     """Test camera connection and display stream."""
@@ -39,52 +76,112 @@ def test_camera_connection(config):
 
         # Get stream info
         info = camera.get_stream_info()
-        logger.info(f"Camera info: {info}")
-
-        # Test frame capture
-        frame_count = 0
-        start_time = time.time()
+        logger.info("Camera info: %s", info)
+
+        # Test frame capture: a worker thread fetches and annotates frames while
+        # this thread only displays them (HighGUI calls stay on one thread)
+        stats = {"frames": 0, "fps": 0.0, "error": None}
+        latest = deque(maxlen=1)
+        frame_ready = threading.Condition()
+        stop = threading.Event()
+
+        start_time = time.monotonic()
+
+        def fetch_frames():
+            prev_ns = time.monotonic_ns()
+            static_overlay = preview_size = None
+            overlay = mask = None
+            last_overlay_update = 0.0
+            backoff = INITIAL_BACKOFF
+            misses = 0
+
+            try:
+                while not stop.is_set():
+                    frame = camera.get_latest_frame(timeout=2.0)
+
+                    if frame is None:
+                        misses += 1
+                        logger.warning("No frame received, retrying in %.2fs", backoff)
+                        if misses % MISSES_BEFORE_RESTART == 0:
+                            logger.warning("Restarting camera stream")
+                            camera.stop()
+                            camera.start()
+                        stop.wait(backoff)
+                        backoff = min(backoff * 2, MAX_BACKOFF)
+                        continue
+
+                    backoff = INITIAL_BACKOFF
+                    misses = 0
+                    stats["frames"] += 1
+
+                    # Smoothed FPS from the gap since the previous frame
+                    now_ns = time.monotonic_ns()
+                    dt_ns = now_ns - prev_ns
+                    prev_ns = now_ns
+                    if dt_ns:
+                        stats["fps"] = 0.9 * stats["fps"] + 0.1 * 1e9 / dt_ns
+
+                    # Display frame info; static text is drawn once, counters at most twice a second
+                    height, width = frame.shape[:2]
+                    if static_overlay is None:
+                        preview_size = (PREVIEW_WIDTH, max(1, round(PREVIEW_WIDTH * height / width)))
+                        static_overlay = np.zeros((min(preview_size[1], OVERLAY_SIZE[0]), min(preview_size[0], OVERLAY_SIZE[1]), 3), np.uint8)
+                        cv2.putText(static_overlay, f"Resolution: {width}x{height}", (10, 40),
+                                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 1)
+                        cv2.putText(static_overlay, "Press 'q' to quit", (10, 80),
+                                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 1)
+
+                    # Annotate and display a small copy; the full-resolution frame is left untouched
+                    preview = cv2.resize(frame, preview_size, interpolation=cv2.INTER_NEAREST)
+
+                    now = time.monotonic()
+                    if now - last_overlay_update > OVERLAY_REFRESH_SECONDS:
+                        overlay, mask = render_overlay(static_overlay, stats["fps"], stats["frames"])
+                        last_overlay_update = now
+
+                    roi = preview[:overlay.shape[0], :overlay.shape[1]]
+                    roi[mask] = overlay[mask]
+
+                    # Hand over only the newest frame; an undisplayed one is dropped
+                    with frame_ready:
+                        latest.append(preview)
+                        frame_ready.notify()
+
+            except Exception as e:
+                stats["error"] = e
+
+        fetcher = threading.Thread(target=fetch_frames, daemon=True)
+        fetcher.start()
 
         logger.info("Testing frame capture (press 'q' to quit)...")
 
-        while True:
-            frame = camera.get_frame(timeout=2.0)
-
-            if frame is None:
-                logger.warning("No frame received")
-                continue
-
-            frame_count += 1
-
-            # Calculate FPS
-            elapsed = time.time() - start_time
-            if elapsed > 0:
-                fps = frame_count / elapsed
-
-            # Display frame info
-            height, width = frame.shape[:2]
-            cv2.putText(frame, f"FPS: {fps:.1f}", (10, 30),
-                       cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-            cv2.putText(frame, f"Resolution: {width}x{height}", (10, 70),
-                       cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-            cv2.putText(frame, f"Frames: {frame_count}", (10, 110),
-                       cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-            cv2.putText(frame, "Press 'q' to quit", (10, 150),
-                       cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+        while fetcher.is_alive():
+            with frame_ready:
+                if not latest:
+                    frame_ready.wait(timeout=1.0)
+                frame = latest.pop() if latest else None
 
             # Show frame
-            cv2.imshow("Camera Test", frame)
+            if frame is not None:
+                cv2.imshow("Camera Test", frame)
 
             # Check for quit
-            key = cv2.waitKey(1) & 0xFF
+            key = poll_key() & 0xFF
             if key == ord('q'):
                 break
 
-        logger.info(f"Test completed. Captured {frame_count} frames in {elapsed:.1f}s (avg FPS: {fps:.1f})")
+        stop.set()
+        fetcher.join(timeout=5)
+        if stats["error"] is not None:
+            raise stats["error"]
+
+        elapsed = time.monotonic() - start_time
+        logger.info("Test completed. Captured %d frames in %.1fs (avg FPS: %.1f)",
+                    stats["frames"], elapsed, stats["frames"] / elapsed)
         return True
 
     except Exception as e:
-        logger.error(f"Camera test failed: {e}")
+        logger.error("Camera test failed: %s", e)
         return False
 
     finally:
@@ -94,7 +191,7 @@ def test_camera_connection(config):
 
 def test_rtsp_camera(url, username=None, password=None):
     """Test RTSP camera connection."""
-    logger.info(f"Testing RTSP camera: {url}")
+    logger.info("Testing RTSP camera: %s", url)
 
     # Build URL with authentication
     if username and password:
@@ -115,7 +212,7 @@ def test_rtsp_camera(url, username=None, password=None):
 
 def test_usb_camera(device_index=0):
     """Test USB camera connection."""
-    logger.info(f"Testing USB camera: device {device_index}")
+    logger.info("Testing USB camera: device %s", device_index)
 
     config = {
         "type": "usb",
@@ -128,36 +225,137 @@ def test_usb_camera(device_index=0):
     return test_camera_connection(config)
 
 
+def find_open_ports(hosts, ports, timeout=0.3, batch_size=512):
+    """Return the (host, port) pairs that accept a TCP connection.
+
+    Starts non-blocking connects for a whole batch and waits on them together
+    with one selector (epoll/kqueue), keeping the batch under fd limits.
+    """
+    endpoints = [(host, port) for host in hosts for port in ports]
+    open_ports = []
+
+    for start in range(0, len(endpoints), batch_size):
+        with selectors.DefaultSelector() as selector:
+            pending = []
+            for endpoint in endpoints[start:start + batch_size]:
+                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                sock.setblocking(False)
+                pending.append(sock)
+                # Anything but "in progress" (e.g. network unreachable) already failed
+                if sock.connect_ex(endpoint) not in (0, errno.EINPROGRESS, errno.EWOULDBLOCK):
+                    continue
+                selector.register(sock, selectors.EVENT_WRITE, endpoint)
+
+            deadline = time.monotonic() + timeout
+            remaining = len(selector.get_map())
+            while remaining and (wait := deadline - time.monotonic()) > 0:
+                for key, _ in selector.select(wait):
+                    selector.unregister(key.fileobj)
+                    remaining -= 1
+                    # Writable with no pending error means the handshake completed
+                    if key.fileobj.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0:
+                        open_ports.append(key.data)
+
+            for sock in pending:
+                sock.close()
+
+    # Keep the scan order stable regardless of which connects finished first
+    order = {endpoint: i for i, endpoint in enumerate(endpoints)}
+    return sorted(open_ports, key=order.__getitem__)
+
+
+def find_open_ports_nmap(network, ports):
+    """Find open ports on network.1-254 with nmap; None if nmap is not installed."""
+    nmap = shutil.which("nmap")
+    if nmap is None:
+        return None
+
+    try:
+        result = subprocess.run(
+            [nmap, "-p", ",".join(map(str, ports)), "--open", "-T4", "-oG", "-", f"{network}.1-254"],
+            capture_output=True, text=True, timeout=60
+        )
+    except subprocess.TimeoutExpired:
+        logger.warning("nmap timed out, falling back to the built-in scan")
+        return None
+    if result.returncode != 0:
+        logger.warning("nmap failed (%s), falling back to the built-in scan", result.stderr.strip())
+        return None
+
+    # Greppable lines look like "Host: 192.168.1.42 ()\tPorts: 554/open/tcp//rtsp///, ..."
+    open_ports = []
+    for line in result.stdout.splitlines():
+        host = re.match(r"Host: (\S+)", line)
+        if host and "Ports:" in line:
+            open_ports.extend((host.group(1), int(port)) for port in re.findall(r"(\d+)/open/tcp", line))
+
+    order = {port: i for i, port in enumerate(ports)}
+    return sorted(open_ports, key=lambda endpoint: (int(endpoint[0].rsplit(".", 1)[1]), order[endpoint[1]]))
+
+
+def add_ffmpeg_socket_timeout(usec):
+    """Append an RTSP socket timeout to OpenCV's FFmpeg capture options.
+
+    FFmpeg 5 (libavformat 59) renamed the option from stimeout to timeout;
+    before that, timeout meant something else (the listen timeout).
+    """
+    match = re.search(r"avformat:\s+YES \((\d+)", cv2.getBuildInformation())
+    key = "timeout" if match and int(match.group(1)) >= 59 else "stimeout"
+
+    options = os.environ.get("OPENCV_FFMPEG_CAPTURE_OPTIONS", "")
+    if re.search(rf"(^|\|){key};", options):
+        return
+    os.environ["OPENCV_FFMPEG_CAPTURE_OPTIONS"] = f"{options}|{key};{usec}" if options else f"{key};{usec}"
+
+
+def probe_stream(url):
+    """Return the URL if OpenCV can open it and grab a frame, else None."""
+    try:
+        cap = cv2.VideoCapture(url, cv2.CAP_FFMPEG)
+        try:
+            if cap.isOpened() and cap.grab():
+                return url
+        finally:
+            cap.release()
+    except Exception:
+        pass
+    return None
+
+
 def scan_network_cameras(network="192.168.1"):
     """Scan network for common camera IPs."""
-    logger.info(f"Scanning network {network}.x for cameras...")
+    logger.info("Scanning network %s.x for cameras...", network)
 
     common_ports = [554, 8080, 80]
     common_paths = ["/stream1", "/video", "/mjpeg", ""]
 
-    found_cameras = []
+    # (scheme, path) templates per port, built once
+    probes = {
+        port: [("rtsp" if port == 554 else "http", path) for path in common_paths]
+        for port in common_ports
+    }
 
-    for i in range(1, 255):
-        ip = f"{network}.{i}"
-
-        for port in common_ports:
-            for path in common_paths:
-                if port == 554:
-                    url = f"rtsp://{ip}:{port}{path}"
-                else:
-                    url = f"http://{ip}:{port}{path}"
-
-                try:
-                    # Quick test with OpenCV
-                    cap = cv2.VideoCapture(url)
-                    if cap.isOpened():
-                        ret, frame = cap.read()
-                        if ret and frame is not None:
-                            logger.info(f"Found camera at: {url}")
-                            found_cameras.append(url)
-                    cap.release()
-                except:
-                    pass
+    # Stage 1: TCP reachability for every host/port, through nmap when installed
+    open_ports = find_open_ports_nmap(network, common_ports)
+    if open_ports is None:
+        hosts = [f"{network}.{i}" for i in range(1, 255)]
+        open_ports = find_open_ports(hosts, common_ports)
+    logger.info("%d open camera ports found", len(open_ports))
+
+    # Stage 2: only open ports get a (slow) OpenCV stream probe; bound RTSP connects to 2s
+    add_ffmpeg_socket_timeout(2000000)
+    urls = [
+        f"{scheme}://{ip}:{port}{path}"
+        for ip, port in open_ports
+        for scheme, path in probes[port]
+    ]
+
+    found_cameras = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=32) as executor:
+        for url in executor.map(probe_stream, urls):
+            if url:
+                logger.info("Found camera at: %s", url)
+                found_cameras.append(url)
 
     return found_cameras
 
@@ -176,17 +374,28 @@ def main():
     if args.scan:
         cameras = scan_network_cameras(args.scan)
         if cameras:
-            logger.info(f"Found {len(cameras)} cameras:")
+            logger.info("Found %d cameras:", len(cameras))
             for camera in cameras:
-                logger.info(f"  - {camera}")
+                logger.info("  - %s", camera)
         else:
             logger.info("No cameras found")
         return
 
     if args.config:
-        import yaml
-        with open(args.config, 'r') as f:
-            config = yaml.safe_load(f)
+        # Generated configs are JSON; only YAML files need PyYAML
+        config_path = Path(args.config)
+        text = config_path.read_bytes()
+        if config_path.suffix == ".json":
+            try:
+                import orjson
+                config = orjson.loads(text)
+            except ImportError:  # falls back to the stdlib decoder
+                import json
+                config = json.loads(text)
+        else:
+            import yaml
+            loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+            config = yaml.load(text, Loader=loader)
 
         camera_config = config.get("camera", {})
         success = test_camera_connection(camera_config)
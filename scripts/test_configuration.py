@@ -6,117 +6,176 @@ Test vehicle configuration generation without YAML dependency.
 """
 
 import sys
+import copy
+import functools
 import json
+import secrets
 from pathlib import Path
 
-# Import the configuration function directly without YAML dependency
-import uuid
+try:
+    import orjson
+except ImportError:  # falls back to the stdlib encoder
+    orjson = None
 
 
-def create_vehicle_config(registration_number, camera_url, camera_username=None,
-                         camera_password=None, fleet_id=None, **kwargs):
-    """Create vehicle configuration without YAML dependency."""
+# Sections that do not depend on the vehicle. Private: configs only ever
+# receive copies of these, never the template dicts themselves.
+_CONFIG_TEMPLATE = {
+    "computer_vision": {
+        "detection_model": "yolov8n.pt",
+        "confidence_threshold": 0.5,
+        "nms_threshold": 0.4,
+        "roi": [0.0, 0.0, 1.0, 1.0],
+        "entry_zone": [0.0, 0.0, 0.5, 1.0],
+        "exit_zone": [0.5, 0.0, 1.0, 1.0]
+    },
+    "face_tracking": {
+        "model": "hog",
+        "tolerance": 0.6,
+        "max_tracking_time": 10,
+        "min_face_size": 50
+    },
+    "footage": {
+        "record_during_trips": True,
+        "storage_path": "footage",
+        "max_storage_gb": 50,
+        "retention_days": 30,
+        "quality": "high",
+        "fps": 15,
+        "auto_upload": True,
+        "upload_on_trip_end": True
+    },
+    "logging": {
+        "level": "INFO",
+        "file": "logs/taxi_counter.log",
+        "max_file_size": "10MB",
+        "backup_count": 5,
+        "console": True,
+        "format": "json"
+    },
+    "development": {
+        "debug": False,
+        "mock_camera": False,
+        "mock_backend": False,
+        "save_debug_images": False,
+        "debug_image_path": "debug_images/"
+    }
+}
+
+_BACKEND_ENDPOINTS = {
+    "trip_start": "/api/v1/trips/start",
+    "trip_stop": "/api/v1/trips/stop",
+    "trip_update": "/api/v1/trips/update",
+    "footage_upload": "/api/v1/footage/upload",
+    "vehicle_register": "/api/v1/vehicles",
+    "health_check": "/api/v1/health"
+}
+
+# Camera type by stream URL scheme; anything unrecognised is treated as HTTP
+_SCHEME_MAP = {
+    "rtsp": "rtsp_stream",
+    "http": "http_stream",
+    "https": "http_stream",
+    "rtmp": "rtmp_stream"
+}
+
+
+def make_vehicle_config_factory(fleet_id=None, api_endpoint="https://api.taxitrack.com",
+                                api_key="", city=""):
+    """Return a config builder with fleet-wide settings applied once.
+
+    The returned function takes the per-vehicle arguments of
+    create_vehicle_config. The vehicle, camera, trip, system and footage
+    sections are new for every config, so they can be edited per vehicle.
+    The remaining sections are copied from the template once per factory and
+    shared by the configs it builds; treat them as read-only.
+    """
+    fleet_id = fleet_id or "default_fleet"
+    shared = copy.deepcopy(_CONFIG_TEMPLATE)
+    backend = {
+        "base_url": api_endpoint,
+        "endpoints": dict(_BACKEND_ENDPOINTS),
+        "api_key": api_key,
+        "timeout": 30,
+        "max_retries": 3,
+        "retry_delay": 5,
+        "update_interval": 30
+    }
+
+    def build(registration_number, camera_url, camera_username=None,
+              camera_password=None, **kwargs):
+        # Generate unique device ID
+        device_id = f"rpi_{registration_number.lower()}_{secrets.token_hex(4)}"
+        capacity = kwargs.get("capacity", 14)
+        route = kwargs.get("route", "")
 
-    # Generate unique device ID
-    device_id = f"rpi_{registration_number.lower()}_{uuid.uuid4().hex[:8]}"
-
-    config = {
-        "vehicle": {
-            "registration_number": registration_number.upper(),
-            "fleet_id": fleet_id or "default_fleet",
-            "make": kwargs.get("make", ""),
-            "model": kwargs.get("model", ""),
-            "year": kwargs.get("year"),
-            "color": kwargs.get("color", ""),
-            "capacity": kwargs.get("capacity", 14),
-            "route": kwargs.get("route", "")
-        },
-        "camera": {
-            "type": "rtsp_stream" if camera_url.startswith("rtsp://") else "http_stream",
-            "stream_url": camera_url,
-            "username": camera_username,
-            "password": camera_password,
-            "width": kwargs.get("width", 1920),
-            "height": kwargs.get("height", 1080),
-            "fps": kwargs.get("fps", 30),
-            "timeout": 30,
-            "reconnect_attempts": 5,
-            "reconnect_delay": 5
-        },
-        "computer_vision": {
-            "detection_model": "yolov8n.pt",
-            "confidence_threshold": 0.5,
-            "nms_threshold": 0.4,
-            "roi": [0.0, 0.0, 1.0, 1.0],
-            "entry_zone": [0.0, 0.0, 0.5, 1.0],
-            "exit_zone": [0.5, 0.0, 1.0, 1.0]
-        },
-        "face_tracking": {
-            "model": "hog",
-            "tolerance": 0.6,
-            "max_tracking_time": 10,
-            "min_face_size": 50
-        },
-        "trip": {
-            "max_capacity": kwargs.get("capacity", 14),
-            "timeout_minutes": 120,
-            "min_duration": 60
-        },
-        "footage": {
-            "record_during_trips": True,
-            "storage_path": "footage",
-            "max_storage_gb": 50,
-            "retention_days": 30,
-            "quality": "high",
-            "fps": 15,
-            "auto_upload": True,
-            "upload_on_trip_end": True
-        },
-        "backend": {
-            "base_url": kwargs.get("api_endpoint", "https://api.taxitrack.com"),
-            "endpoints": {
-                "trip_start": "/api/v1/trips/start",
-                "trip_stop": "/api/v1/trips/stop",
-                "trip_update": "/api/v1/trips/update",
-                "footage_upload": "/api/v1/footage/upload",
-                "vehicle_register": "/api/v1/vehicles",
-                "health_check": "/api/v1/health"
+        return {
+            "vehicle": {
+                "registration_number": registration_number.upper(),
+                "fleet_id": fleet_id,
+                "make": kwargs.get("make", ""),
+                "model": kwargs.get("model", ""),
+                "year": kwargs.get("year"),
+                "color": kwargs.get("color", ""),
+                "capacity": capacity,
+                "route": route
             },
-            "api_key": kwargs.get("api_key", ""),
-            "timeout": 30,
-            "max_retries": 3,
-            "retry_delay": 5,
-            "update_interval": 30
-        },
-        "system": {
-            "device_id": device_id,
-            "location": {
-                "city": kwargs.get("city", ""),
-                "route": kwargs.get("route", "")
+            "camera": {
+                "type": _SCHEME_MAP.get(camera_url.split("://", 1)[0].lower(), "http_stream"),
+                "stream_url": camera_url,
+                "username": camera_username,
+                "password": camera_password,
+                "width": kwargs.get("width", 1920),
+                "height": kwargs.get("height", 1080),
+                "fps": kwargs.get("fps", 30),
+                "timeout": 30,
+                "reconnect_attempts": 5,
+                "reconnect_delay": 5
             },
-            "max_cpu_usage": 80,
-            "max_memory_usage": 80,
-            "watchdog_enabled": True,
-            "watchdog_timeout": 60
-        },
-        "logging": {
-            "level": "INFO",
-            "file": "logs/taxi_counter.log",
-            "max_file_size": "10MB",
-            "backup_count": 5,
-            "console": True,
-            "format": "json"
-        },
-        "development": {
-            "debug": False,
-            "mock_camera": False,
-            "mock_backend": False,
-            "save_debug_images": False,
-            "debug_image_path": "debug_images/"
+            "computer_vision": shared["computer_vision"],
+            "face_tracking": shared["face_tracking"],
+            "trip": {
+                "max_capacity": capacity,
+                "timeout_minutes": 120,
+                "min_duration": 60
+            },
+            "footage": dict(shared["footage"]),
+            "backend": backend,
+            "system": {
+                "device_id": device_id,
+                "location": {
+                    "city": city,
+                    "route": route
+                },
+                "max_cpu_usage": 80,
+                "max_memory_usage": 80,
+                "watchdog_enabled": True,
+                "watchdog_timeout": 60
+            },
+            "logging": shared["logging"],
+            "development": shared["development"]
         }
-    }
 
-    return config
+    return build
+
+
+@functools.lru_cache(maxsize=16)
+def _cached_factory(fleet_id, api_endpoint, api_key, city):
+    """Reuse one factory per fleet and backend for create_vehicle_config."""
+    return make_vehicle_config_factory(fleet_id, api_endpoint=api_endpoint,
+                                       api_key=api_key, city=city)
+
+
+def create_vehicle_config(registration_number, camera_url, camera_username=None,
+                         camera_password=None, fleet_id=None, **kwargs):
+    """Create vehicle configuration without YAML dependency."""
+    factory = _cached_factory(
+        fleet_id,
+        kwargs.pop("api_endpoint", "https://api.taxitrack.com"),
+        kwargs.pop("api_key", ""),
+        kwargs.pop("city", "")
+    )
+    return factory(registration_number, camera_url, camera_username, camera_password, **kwargs)
 
 
 def test_configuration():
@@ -163,11 +222,14 @@ def test_configuration():
     output_dir.mkdir(exist_ok=True)
 
     config_file = output_dir / f"{config['vehicle']['registration_number']}_config.json"
-    with open(config_file, 'w') as f:
-        json.dump(config, f, indent=2, default=str)
+    if orjson is not None:
+        data = orjson.dumps(config, option=orjson.OPT_INDENT_2, default=str)
+    else:
+        data = json.dumps(config, indent=2, default=str).encode()
+    config_file.write_bytes(data)
 
     print(f"\n💾 Configuration saved to: {config_file}")
-    print(f"📁 File size: {config_file.stat().st_size} bytes")
+    print(f"📁 File size: {len(data)} bytes")
 
     return True
 
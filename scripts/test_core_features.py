@@ -8,12 +8,10 @@ This tests the business logic and data models.
 
 import sys
 import logging
-import json
-from pathlib import Path
 from datetime import datetime, timedelta
 
 # Add src to path
-sys.path.append(str(Path(__file__).parent.parent / "src"))
+import _bootstrap  # noqa: F401
 
 logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -22,20 +20,8 @@ logger = logging.getLogger(__name__)
 def test_vehicle_models():
     """Test vehicle management models without OpenCV."""
     try:
-        # Import directly from models to avoid OpenCV dependency in footage_manager
-        import sys
-        import importlib.util
-
-        # Load the models module directly
-        models_path = Path(__file__).parent.parent / "src" / "vehicle_management" / "models.py"
-        spec = importlib.util.spec_from_file_location("vehicle_models", models_path)
-        vehicle_models = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(vehicle_models)
-
-        Vehicle = vehicle_models.Vehicle
-        VehicleStatus = vehicle_models.VehicleStatus
-        CameraType = vehicle_models.CameraType
-        FootageRecord = vehicle_models.FootageRecord
+        # The package loads footage_manager (and OpenCV) lazily, so this stays cv2-free
+        from vehicle_management.models import Vehicle, VehicleStatus, CameraType, FootageRecord
 
         # Test Vehicle creation
         vehicle = Vehicle(
@@ -64,12 +50,14 @@ def test_vehicle_models():
         footage.increment_upload_attempts()
         footage.mark_uploaded("https://api.example.com/footage/123")
 
-        logger.info("✅ Vehicle Models Test PASSED")
-        logger.info(f"   Vehicle: {vehicle.registration_number}")
-        logger.info(f"   Stream URL: {stream_url}")
-        logger.info(f"   Summary fields: {len(summary)}")
-        logger.info(f"   Footage: {footage.filename}")
-        logger.info(f"   Upload attempts: {footage.upload_attempts}")
+        logger.info("\n".join([
+            "✅ Vehicle Models Test PASSED",
+            f"   Vehicle: {vehicle.registration_number}",
+            f"   Stream URL: {stream_url}",
+            f"   Summary fields: {len(summary)}",
+            f"   Footage: {footage.filename}",
+            f"   Upload attempts: {footage.upload_attempts}"
+        ]))
 
         return True
 
@@ -91,35 +79,36 @@ def test_trip_models():
         )
 
         # Test passenger counting
-        trip.update_passenger_count(5)
-        trip.update_passenger_count(8)
-        trip.update_passenger_count(15)  # Should trigger overload
+        trip.update_passenger_counts([5, 8, 15])  # 15 should trigger overload
 
         # Test events
+        now_iso = datetime.now().isoformat()
         entry_event = trip.add_event(EventType.PASSENGER_ENTRY, {
             "passenger_count": 8,
             "confidence": 0.95,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso
         })
 
         exit_event = trip.add_event(EventType.PASSENGER_EXIT, {
             "passenger_count": 7,
             "confidence": 0.92,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso
         })
 
         # Test trip completion
         trip.end_trip()
 
-        logger.info("✅ Trip Models Test PASSED")
-        logger.info(f"   Trip ID: {trip.trip_id}")
-        logger.info(f"   Final passenger count: {trip.current_passenger_count}")
-        logger.info(f"   Overload detected: {trip.is_overloaded}")
-        logger.info(f"   Events recorded: {len(trip.events)}")
-        logger.info(f"   Trip status: {trip.status.value}")
         duration = trip.get_duration_minutes()
         duration_str = f"{duration:.1f}" if duration is not None else "0.0"
-        logger.info(f"   Duration: {duration_str} minutes")
+        logger.info("\n".join([
+            "✅ Trip Models Test PASSED",
+            f"   Trip ID: {trip.trip_id}",
+            f"   Final passenger count: {trip.current_passenger_count}",
+            f"   Overload detected: {trip.is_overloaded}",
+            f"   Events recorded: {len(trip.events)}",
+            f"   Trip status: {trip.status.value}",
+            f"   Duration: {duration_str} minutes"
+        ]))
 
         return True
 
@@ -163,14 +152,16 @@ def test_live_streaming_models():
 
         duration = session.get_duration_seconds()
 
-        logger.info("✅ Live Streaming Models Test PASSED")
-        logger.info(f"   Stream ID: {stream_config.stream_id}")
-        logger.info(f"   Quality: {stream_config.quality.value}")
-        logger.info(f"   Resolution: {resolution}")
-        logger.info(f"   Bitrate: {bitrate} kbps")
-        logger.info(f"   Current viewers: {session.current_viewers}")
-        logger.info(f"   Error count: {session.error_count}")
-        logger.info(f"   Duration: {duration} seconds")
+        logger.info("\n".join([
+            "✅ Live Streaming Models Test PASSED",
+            f"   Stream ID: {stream_config.stream_id}",
+            f"   Quality: {stream_config.quality.value}",
+            f"   Resolution: {resolution}",
+            f"   Bitrate: {bitrate} kbps",
+            f"   Current viewers: {session.current_viewers}",
+            f"   Error count: {session.error_count}",
+            f"   Duration: {duration} seconds"
+        ]))
 
         return True
 
@@ -182,16 +173,7 @@ def test_live_streaming_models():
 def test_json_serialization():
     """Test JSON serialization of models."""
     try:
-        # Import vehicle models directly
-        import importlib.util
-        models_path = Path(__file__).parent.parent / "src" / "vehicle_management" / "models.py"
-        spec = importlib.util.spec_from_file_location("vehicle_models", models_path)
-        vehicle_models = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(vehicle_models)
-
-        Vehicle = vehicle_models.Vehicle
-        CameraType = vehicle_models.CameraType
-
+        from vehicle_management.models import Vehicle, CameraType
         from trip_management.models import Trip, EventType
         from live_streaming.models import StreamConfig, StreamQuality
 
@@ -206,8 +188,8 @@ def test_json_serialization():
             camera_password="Random336#"
         )
 
-        vehicle_json = vehicle.model_dump_json()
-        vehicle_dict = json.loads(vehicle_json)
+        assert isinstance(vehicle.model_dump_json(), str)
+        vehicle_dict = vehicle.model_dump(mode="json")
 
         # Test Trip JSON serialization
         trip = Trip(
@@ -217,8 +199,8 @@ def test_json_serialization():
         )
 
         trip.add_event(EventType.PASSENGER_ENTRY, {"count": 5})
-        trip_json = trip.model_dump_json()
-        trip_dict = json.loads(trip_json)
+        assert isinstance(trip.model_dump_json(), str)
+        trip_dict = trip.model_dump(mode="json")
 
         # Test StreamConfig JSON serialization
         stream_config = StreamConfig(
@@ -228,13 +210,15 @@ def test_json_serialization():
             created_by="test_user"
         )
 
-        stream_json = stream_config.model_dump_json()
-        stream_dict = json.loads(stream_json)
+        assert isinstance(stream_config.model_dump_json(), str)
+        stream_dict = stream_config.model_dump(mode="json")
 
-        logger.info("✅ JSON Serialization Test PASSED")
-        logger.info(f"   Vehicle JSON keys: {len(vehicle_dict)}")
-        logger.info(f"   Trip JSON keys: {len(trip_dict)}")
-        logger.info(f"   Stream config JSON keys: {len(stream_dict)}")
+        logger.info("\n".join([
+            "✅ JSON Serialization Test PASSED",
+            f"   Vehicle JSON keys: {len(vehicle_dict)}",
+            f"   Trip JSON keys: {len(trip_dict)}",
+            f"   Stream config JSON keys: {len(stream_dict)}"
+        ]))
 
         return True
 
@@ -267,12 +251,14 @@ def main():
     logger.info(f"📊 Results: {passed}/{total} tests passed")
 
     if passed == total:
-        logger.info("🎉 ALL CORE TESTS PASSED!")
-        logger.info("\n🔧 System is ready for:")
-        logger.info("   • Camera integration (install opencv-python)")
-        logger.info("   • Configuration management (install pyyaml)")
-        logger.info("   • Backend API connection")
-        logger.info("   • Raspberry Pi deployment")
+        logger.info("\n".join([
+            "🎉 ALL CORE TESTS PASSED!",
+            "\n🔧 System is ready for:",
+            "   • Camera integration (install opencv-python)",
+            "   • Configuration management (install pyyaml)",
+            "   • Backend API connection",
+            "   • Raspberry Pi deployment"
+        ]))
         return True
     else:
         logger.error(f"❌ {total - passed} tests failed")
@@ -9,59 +9,180 @@ without requiring backend connectivity or camera hardware.
 import sys
 import logging
 import asyncio
+import copy
 import json
+import threading
 from pathlib import Path
 from datetime import datetime, timedelta
 import uuid
 
+try:
+    import orjson
+except ImportError:  # falls back to the stdlib encoder
+    orjson = None
+
 # Add src to path
-sys.path.append(str(Path(__file__).parent.parent / "src"))
+import _bootstrap  # noqa: F401
 
 logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Import the models once per process; a failure is reported by the tests that need it
+import_errors = {}
+
+try:
+    from vehicle_management.models import Vehicle, CameraType, FootageRecord
+
+    _VEHICLE_KWARGS = dict(
+        vehicle_id="test_HDJ864L",
+        registration_number="HDJ864L",
+        device_id="rpi_HDJ864L_001",
+        camera_type=CameraType.RTSP_STREAM,
+        camera_url="rtsp://192.168.1.100:554/stream1",
+        camera_username="admin",
+        camera_password="Random336#"
+    )
+except ImportError as e:
+    import_errors["vehicle_management"] = e
+
+try:
+    from trip_management.models import Trip, EventType
+except ImportError as e:
+    import_errors["trip_management"] = e
+
+try:
+    from live_streaming.models import StreamConfig, StreamSession, StreamQuality, StreamProtocol
+    from live_streaming.stream_manager import StreamManager
+except ImportError as e:
+    import_errors["live_streaming"] = e
+
+try:
+    from configure_vehicle import create_vehicle_config
+except ImportError as e:
+    import_errors["configure_vehicle"] = e
+
+# Shared fixtures. Each model is validated once in its own test; the other
+# tests build it with model_construct, which skips validation.
+_TRIP_KWARGS = dict(
+    trip_id="trip_HDJ864L_001",
+    device_id="rpi_HDJ864L_001",
+    max_capacity=14
+)
+
+_REQUIRED_SECTIONS = frozenset((
+    "vehicle", "camera", "computer_vision", "face_tracking",
+    "trip", "footage", "backend", "system", "logging", "development"
+))
+
+# Built on first use by vehicle_test_config()
+_TEST_CONFIG = None
+
+
+def vehicle_test_config():
+    """Return a copy of the HDJ864L test config, generated once per process."""
+    global _TEST_CONFIG
+    if _TEST_CONFIG is None:
+        require("configure_vehicle")
+        _TEST_CONFIG = create_vehicle_config(
+            registration_number="HDJ864L",
+            camera_url="rtsp://192.168.1.100:554/stream1",
+            camera_username="admin",
+            camera_password="Random336#",
+            fleet_id="cape_town_fleet_001",
+            make="Toyota",
+            model="Quantum",
+            capacity=14,
+            city="Cape Town",
+            route="Bellville to CBD"
+        )
+    return copy.deepcopy(_TEST_CONFIG)
+
+
+def require(*module_names):
+    """Re-raise the import error recorded for any of the given modules."""
+    for module_name in module_names:
+        if module_name in import_errors:
+            raise import_errors[module_name]
+
+
+class _ThreadLogBuffer(logging.Filter):
+    """Hold back records logged by threads that are running a test."""
+
+    def __init__(self):
+        super().__init__()
+        self._buffers = {}
+
+    def start(self):
+        """Start buffering the calling thread's records and return the buffer."""
+        records = self._buffers[threading.get_ident()] = []
+        return records
+
+    def stop(self):
+        """Stop buffering the calling thread's records."""
+        del self._buffers[threading.get_ident()]
+
+    def filter(self, record):
+        records = self._buffers.get(record.thread)
+        if records is None:
+            return True
+        records.append(record)
+        return False
+
 
 class LocalFeatureTester:
     """Test suite for local features."""
 
+    # (display name, test method name), in reporting order
+    _TESTS = (
+        ("Vehicle Models", "test_vehicle_models"),
+        ("Trip Models", "test_trip_models"),
+        ("Live Streaming Models", "test_live_streaming_models"),
+        ("Configuration Generation", "test_configuration_generation"),
+        ("Stream Manager", "test_stream_manager"),
+        ("JSON Serialization", "test_json_serialization"),
+        ("File Operations", "test_file_operations")
+    )
+
     def __init__(self):
         self.test_results = {}
         self.passed_tests = 0
         self.total_tests = 0
+        self._log_buffer = _ThreadLogBuffer()
 
-    def run_test(self, test_name: str, test_func):
-        """Run a single test and record results."""
-        self.total_tests += 1
-        logger.info(f"\n🧪 Testing: {test_name}")
-
+    def _run_test_capture(self, test_func):
+        """Run a single test and return (status, exception, log records) without recording it."""
+        records = self._log_buffer.start()
         try:
-            result = test_func()
-            if result:
-                self.passed_tests += 1
-                self.test_results[test_name] = "PASSED"
-                logger.info(f"✅ {test_name} - PASSED")
-            else:
-                self.test_results[test_name] = "FAILED"
-                logger.error(f"❌ {test_name} - FAILED")
+            return ("PASSED" if test_func() else "FAILED"), None, records
         except Exception as e:
-            self.test_results[test_name] = f"ERROR: {str(e)}"
-            logger.error(f"💥 {test_name} - ERROR: {e}")
+            return f"ERROR: {str(e)}", e, records
+        finally:
+            self._log_buffer.stop()
+
+    def _record(self, test_name: str, outcome):
+        """Replay a test's held-back log records, then record and log its outcome."""
+        status, error, records = outcome
+        for record in records:
+            logger.handle(record)
+
+        self.total_tests += 1
+        self.test_results[test_name] = status
+
+        if status == "PASSED":
+            self.passed_tests += 1
+            logger.info(f"✅ {test_name} - PASSED")
+        elif error is None:
+            logger.error(f"❌ {test_name} - FAILED")
+        else:
+            logger.error(f"💥 {test_name} - ERROR: {error}")
 
     def test_vehicle_models(self):
         """Test vehicle management models."""
         try:
-            from vehicle_management.models import Vehicle, VehicleStatus, CameraType, FootageRecord
+            require("vehicle_management")
 
             # Test Vehicle creation
-            vehicle = Vehicle(
-                vehicle_id="test_HDJ864L",
-                registration_number="HDJ864L",
-                device_id="rpi_HDJ864L_001",
-                camera_type=CameraType.RTSP_STREAM,
-                camera_url="rtsp://192.168.1.100:554/stream1",
-                camera_username="admin",
-                camera_password="Random336#"
-            )
+            vehicle = Vehicle(**_VEHICLE_KWARGS)
 
             # Test vehicle methods
             stream_url = vehicle.get_camera_stream_url()
@@ -79,68 +200,63 @@ class LocalFeatureTester:
             footage.increment_upload_attempts()
             footage.mark_uploaded("https://api.example.com/footage/123")
 
-            logger.info(f"   Vehicle: {vehicle.registration_number}")
-            logger.info(f"   Stream URL: {stream_url}")
-            logger.info(f"   Summary fields: {len(summary)}")
-            logger.info(f"   Footage: {footage.filename}")
-            logger.info(f"   Upload attempts: {footage.upload_attempts}")
+            logger.info("   Vehicle: %s", vehicle.registration_number)
+            logger.info("   Stream URL: %s", stream_url)
+            logger.info("   Summary fields: %s", len(summary))
+            logger.info("   Footage: %s", footage.filename)
+            logger.info("   Upload attempts: %s", footage.upload_attempts)
 
             return True
 
         except Exception as e:
-            logger.error(f"   Vehicle models test failed: {e}")
+            logger.error("   Vehicle models test failed: %s", e)
             return False
 
     def test_trip_models(self):
         """Test trip management models."""
         try:
-            from trip_management.models import Trip, TripStatus, EventType
+            require("trip_management")
 
             # Create test trip
-            trip = Trip(
-                trip_id="trip_HDJ864L_001",
-                device_id="rpi_HDJ864L_001",
-                max_capacity=14
-            )
+            trip = Trip(**_TRIP_KWARGS)
 
             # Test passenger counting
-            trip.update_passenger_count(5)
-            trip.update_passenger_count(8)
-            trip.update_passenger_count(15)  # Should trigger overload
+            trip.update_passenger_counts([5, 8, 15])  # 15 should trigger overload
 
             # Test events
+            now_iso = datetime.now().isoformat()
             entry_event = trip.add_event(EventType.PASSENGER_ENTRY, {
                 "passenger_count": 8,
                 "confidence": 0.95,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": now_iso
             })
 
             exit_event = trip.add_event(EventType.PASSENGER_EXIT, {
                 "passenger_count": 7,
                 "confidence": 0.92,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": now_iso
             })
 
             # Test trip completion
             trip.end_trip()
 
-            logger.info(f"   Trip ID: {trip.trip_id}")
-            logger.info(f"   Final passenger count: {trip.current_passenger_count}")
-            logger.info(f"   Overload detected: {trip.is_overloaded}")
-            logger.info(f"   Events recorded: {len(trip.events)}")
-            logger.info(f"   Trip status: {trip.status.value}")
-            logger.info(f"   Duration: {trip.get_duration_minutes()} minutes")
+            logger.info("   Trip ID: %s", trip.trip_id)
+            logger.info("   Final passenger count: %s", trip.current_passenger_count)
+            logger.info("   Overload detected: %s", trip.is_overloaded)
+            logger.info("   Events recorded: %s", len(trip.events))
+            logger.info("   Trip status: %s", trip.status.value)
+            logger.info("   Duration: %s minutes", trip.get_duration_minutes())
 
             return True
 
         except Exception as e:
-            logger.error(f"   Trip models test failed: {e}")
+            logger.error("   Trip models test failed: %s", e)
             return False
 
     def test_live_streaming_models(self):
         """Test live streaming models."""
         try:
-            from live_streaming.models import StreamConfig, StreamSession, StreamQuality, StreamProtocol
+            require("live_streaming")
 
             # Create stream configuration
             stream_config = StreamConfig(
@@ -172,49 +288,30 @@ class LocalFeatureTester:
 
             duration = session.get_duration_seconds()
 
-            logger.info(f"   Stream ID: {stream_config.stream_id}")
-            logger.info(f"   Quality: {stream_config.quality.value}")
-            logger.info(f"   Resolution: {resolution}")
-            logger.info(f"   Bitrate: {bitrate} kbps")
-            logger.info(f"   Current viewers: {session.current_viewers}")
-            logger.info(f"   Error count: {session.error_count}")
-            logger.info(f"   Duration: {duration} seconds")
+            logger.info("   Stream ID: %s", stream_config.stream_id)
+            logger.info("   Quality: %s", stream_config.quality.value)
+            logger.info("   Resolution: %s", resolution)
+            logger.info("   Bitrate: %s kbps", bitrate)
+            logger.info("   Current viewers: %s", session.current_viewers)
+            logger.info("   Error count: %s", session.error_count)
+            logger.info("   Duration: %s seconds", duration)
 
             return True
 
         except Exception as e:
-            logger.error(f"   Live streaming models test failed: {e}")
+            logger.error("   Live streaming models test failed: %s", e)
             return False
 
     def test_configuration_generation(self):
         """Test vehicle configuration generation."""
         try:
-            sys.path.append(str(Path(__file__).parent))
-            from configure_vehicle import create_vehicle_config
-
             # Create configuration for HDJ864L
-            config = create_vehicle_config(
-                registration_number="HDJ864L",
-                camera_url="rtsp://192.168.1.100:554/stream1",
-                camera_username="admin",
-                camera_password="Random336#",
-                fleet_id="cape_town_fleet_001",
-                make="Toyota",
-                model="Quantum",
-                capacity=14,
-                city="Cape Town",
-                route="Bellville to CBD"
-            )
+            config = vehicle_test_config()
 
             # Validate configuration structure
-            required_sections = [
-                "vehicle", "camera", "computer_vision", "face_tracking",
-                "trip", "footage", "backend", "system", "logging", "development"
-            ]
-
-            for section in required_sections:
-                if section not in config:
-                    raise ValueError(f"Missing configuration section: {section}")
+            missing = _REQUIRED_SECTIONS - config.keys()
+            if missing:
+                raise ValueError(f"Missing configuration sections: {', '.join(sorted(missing))}")
 
             # Test specific values
             assert config["vehicle"]["registration_number"] == "HDJ864L"
@@ -223,23 +320,22 @@ class LocalFeatureTester:
             assert config["vehicle"]["capacity"] == 14
             assert "rpi_HDJ864L_" in config["system"]["device_id"]
 
-            logger.info(f"   Registration: {config['vehicle']['registration_number']}")
-            logger.info(f"   Device ID: {config['system']['device_id']}")
-            logger.info(f"   Camera URL: {config['camera']['stream_url']}")
-            logger.info(f"   Fleet ID: {config['vehicle']['fleet_id']}")
-            logger.info(f"   Configuration sections: {len(config)}")
+            logger.info("   Registration: %s", config['vehicle']['registration_number'])
+            logger.info("   Device ID: %s", config['system']['device_id'])
+            logger.info("   Camera URL: %s", config['camera']['stream_url'])
+            logger.info("   Fleet ID: %s", config['vehicle']['fleet_id'])
+            logger.info("   Configuration sections: %s", len(config))
 
             return True
 
         except Exception as e:
-            logger.error(f"   Configuration generation test failed: {e}")
+            logger.error("   Configuration generation test failed: %s", e)
             return False
 
     def test_stream_manager(self):
         """Test stream manager functionality."""
         try:
-            from live_streaming.stream_manager import StreamManager
-            from live_streaming.models import StreamConfig, StreamQuality
+            require("live_streaming")
 
             # Create test configuration
             test_config = {
@@ -258,7 +354,7 @@ class LocalFeatureTester:
             )
 
             # Test stream configuration
-            stream_config = StreamConfig(
+            stream_config = StreamConfig.model_construct(
                 vehicle_id="test_HDJ864L",
                 registration_number="HDJ864L",
                 quality=StreamQuality.MEDIUM,
@@ -269,74 +365,64 @@ class LocalFeatureTester:
             active_streams = manager.get_active_streams()
             viewer_count = manager.get_viewer_count("nonexistent_stream")
 
-            logger.info(f"   Manager created for: {manager.registration_number}")
-            logger.info(f"   Base URL: {manager.base_url}")
-            logger.info(f"   Active streams: {len(active_streams)}")
-            logger.info(f"   Storage path: {manager.stream_storage_path}")
-            logger.info(f"   Stats: {manager.stats}")
+            logger.info("   Manager created for: %s", manager.registration_number)
+            logger.info("   Base URL: %s", manager.base_url)
+            logger.info("   Active streams: %s", len(active_streams))
+            logger.info("   Storage path: %s", manager.stream_storage_path)
+            logger.info("   Stats: %s", manager.stats)
 
             return True
 
         except Exception as e:
-            logger.error(f"   Stream manager test failed: {e}")
+            logger.error("   Stream manager test failed: %s", e)
             return False
 
     def test_json_serialization(self):
         """Test JSON serialization of models."""
         try:
-            from vehicle_management.models import Vehicle, CameraType
-            from trip_management.models import Trip, EventType
-            from live_streaming.models import StreamConfig, StreamQuality
+            require("vehicle_management", "trip_management", "live_streaming")
 
             # Test Vehicle JSON serialization
-            vehicle = Vehicle(
-                vehicle_id="test_HDJ864L",
-                registration_number="HDJ864L",
-                device_id="rpi_HDJ864L_001",
-                camera_type=CameraType.RTSP_STREAM,
-                camera_url="rtsp://192.168.1.100:554/stream1",
-                camera_username="admin",
-                camera_password="Random336#"
-            )
+            vehicle = Vehicle.model_construct(**_VEHICLE_KWARGS)
 
-            vehicle_json = vehicle.model_dump_json()
-            vehicle_dict = json.loads(vehicle_json)
+            assert isinstance(vehicle.model_dump_json(), str)
+            vehicle_dict = vehicle.model_dump(mode="json")
 
             # Test Trip JSON serialization
-            trip = Trip(
-                trip_id="trip_HDJ864L_001",
-                device_id="rpi_HDJ864L_001",
-                max_capacity=14
-            )
+            trip = Trip.model_construct(**_TRIP_KWARGS)
 
             trip.add_event(EventType.PASSENGER_ENTRY, {"count": 5})
-            trip_json = trip.model_dump_json()
-            trip_dict = json.loads(trip_json)
+            assert isinstance(trip.model_dump_json(), str)
+            trip_dict = trip.model_dump(mode="json")
 
             # Test StreamConfig JSON serialization
-            stream_config = StreamConfig(
+            stream_config = StreamConfig.model_construct(
                 vehicle_id="test_HDJ864L",
                 registration_number="HDJ864L",
                 quality=StreamQuality.HIGH,
                 created_by="test_user"
             )
 
-            stream_json = stream_config.model_dump_json()
-            stream_dict = json.loads(stream_json)
+            assert isinstance(stream_config.model_dump_json(), str)
+            stream_dict = stream_config.model_dump(mode="json")
 
-            logger.info(f"   Vehicle JSON keys: {len(vehicle_dict)}")
-            logger.info(f"   Trip JSON keys: {len(trip_dict)}")
-            logger.info(f"   Stream config JSON keys: {len(stream_dict)}")
-            logger.info(f"   All models serializable to JSON")
+            logger.info("   Vehicle JSON keys: %s", len(vehicle_dict))
+            logger.info("   Trip JSON keys: %s", len(trip_dict))
+            logger.info("   Stream config JSON keys: %s", len(stream_dict))
+            logger.info("   All models serializable to JSON")
 
             return True
 
         except Exception as e:
-            logger.error(f"   JSON serialization test failed: {e}")
+            logger.error("   JSON serialization test failed: %s", e)
             return False
 
     def test_file_operations(self):
-        """Test file operations and path handling."""
+        """Test file operations and path handling.
+
+        Plain blocking I/O is fine here: run_all_tests already runs every test
+        through asyncio.to_thread, which is also how aiofiles works.
+        """
         try:
             import tempfile
             import shutil
@@ -357,57 +443,51 @@ class LocalFeatureTester:
                     }
                 }
 
-                # Write configuration
-                with open(config_path, 'w') as f:
-                    json.dump(test_config, f, indent=2)
-
-                # Read configuration back
-                with open(config_path, 'r') as f:
-                    loaded_config = json.load(f)
-
-                # Test footage directory creation
-                footage_dir = temp_path / "footage"
-                footage_dir.mkdir(parents=True, exist_ok=True)
-
-                # Test log directory creation
-                logs_dir = temp_path / "logs"
-                logs_dir.mkdir(parents=True, exist_ok=True)
-
-                # Test stream directory creation
-                streams_dir = temp_path / "streams"
-                streams_dir.mkdir(parents=True, exist_ok=True)
-
-                logger.info(f"   Config file created: {config_path.exists()}")
-                logger.info(f"   Config loaded correctly: {loaded_config['vehicle']['registration_number']}")
-                logger.info(f"   Footage directory: {footage_dir.exists()}")
-                logger.info(f"   Logs directory: {logs_dir.exists()}")
-                logger.info(f"   Streams directory: {streams_dir.exists()}")
+                # Write configuration and read it back
+                if orjson is not None:
+                    config_path.write_bytes(orjson.dumps(test_config, option=orjson.OPT_INDENT_2))
+                    loaded_config = orjson.loads(config_path.read_bytes())
+                else:
+                    config_path.write_text(json.dumps(test_config, indent=2))
+                    loaded_config = json.loads(config_path.read_text())
+
+                # Test footage, log and stream directory creation
+                # (temp_path already exists, so no parents are needed)
+                for sub in ("footage", "logs", "streams"):
+                    (temp_path / sub).mkdir(exist_ok=True)
+
+                logger.info("   Config file created: %s", config_path.exists())
+                logger.info("   Config loaded correctly: %s", loaded_config['vehicle']['registration_number'])
+                logger.info("   Footage directory: %s", (temp_path / 'footage').exists())
+                logger.info("   Logs directory: %s", (temp_path / 'logs').exists())
+                logger.info("   Streams directory: %s", (temp_path / 'streams').exists())
 
                 return True
 
         except Exception as e:
-            logger.error(f"   File operations test failed: {e}")
+            logger.error("   File operations test failed: %s", e)
             return False
 
-    def run_all_tests(self):
+    async def run_all_tests(self):
         """Run all local feature tests."""
         logger.info("🚀 Starting Local Features Test Suite")
         logger.info("=" * 60)
 
-        # Define all tests
-        tests = [
-            ("Vehicle Models", self.test_vehicle_models),
-            ("Trip Models", self.test_trip_models),
-            ("Live Streaming Models", self.test_live_streaming_models),
-            ("Configuration Generation", self.test_configuration_generation),
-            ("Stream Manager", self.test_stream_manager),
-            ("JSON Serialization", self.test_json_serialization),
-            ("File Operations", self.test_file_operations)
-        ]
-
-        # Run each test
-        for test_name, test_func in tests:
-            self.run_test(test_name, test_func)
+        # The tests are independent and mostly wait on imports and the
+        # filesystem, so run them concurrently and report in list order.
+        # Their log output is held back and replayed under each test's header.
+        logger.addFilter(self._log_buffer)
+        try:
+            outcomes = await asyncio.gather(*(
+                asyncio.to_thread(self._run_test_capture, getattr(self, attr))
+                for _, attr in self._TESTS
+            ))
+        finally:
+            logger.removeFilter(self._log_buffer)
+
+        for (test_name, _), outcome in zip(self._TESTS, outcomes):
+            logger.info(f"\n🧪 Testing: {test_name}")
+            self._record(test_name, outcome)
 
         # Print summary
         logger.info("\n" + "=" * 60)
@@ -438,7 +518,7 @@ class LocalFeatureTester:
 def main():
     """Main test execution function."""
     tester = LocalFeatureTester()
-    success = tester.run_all_tests()
+    success = asyncio.run(tester.run_all_tests())
 
     # Exit with appropriate code
     sys.exit(0 if success else 1)
@@ -106,6 +106,27 @@ class CameraStream:
             logger.warning("No frame available within timeout")
             return None
 
+    def get_latest_frame(self, timeout: float = 1.0) -> Optional[np.ndarray]:
+        """
+        Get the newest frame, discarding older frames still queued.
+
+        Suited to previews that only display what the camera sees now and
+        should not fall behind when they render slower than the camera.
+
+        Args:
+            timeout: Maximum time to wait for a frame in seconds
+
+        Returns:
+            numpy.ndarray: Newest frame or None if no frame available
+        """
+        frame = self.get_frame(timeout=timeout)
+        while frame is not None:
+            try:
+                frame = self.frame_queue.get_nowait()
+            except Empty:
+                break
+        return frame
+
     def is_connected(self) -> bool:
         """
         Check if camera is connected and streaming.
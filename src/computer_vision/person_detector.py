@@ -8,6 +8,7 @@ Provides bounding box coordinates and confidence scores for detected persons.
 import cv2
 import numpy as np
 import logging
+from functools import lru_cache
 from typing import List, Tuple, Optional
 from ultralytics import YOLO
 import torch
@@ -15,6 +16,33 @@ import torch
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=None)
+def load_yolo_model(model_path: str, device: str) -> YOLO:
+    """
+    Load a YOLO model once per process.
+
+    Detectors created later with the same model and device (e.g. after the
+    application restarts its counter) reuse the loaded weights instead of
+    reading them from disk again. Not meant for detectors running
+    concurrently, since one YOLO instance is not safe to share across threads.
+
+    Args:
+        model_path: YOLO model path/name
+        device: Inference device ('cuda', 'mps', or 'cpu')
+
+    Returns:
+        YOLO: Loaded model on the requested device
+    """
+    logger.info(f"Loading YOLO model: {model_path}")
+    model = YOLO(model_path)
+
+    # Move model to appropriate device
+    if device != "cpu":
+        model.to(device)
+
+    return model
+
+
 class Detection:
     """Represents a person detection with bounding box and confidence."""
 
@@ -94,13 +122,7 @@ class PersonDetector:
         """Load YOLO model with error handling."""
         try:
             model_path = self.config["detection_model"]
-            logger.info(f"Loading YOLO model: {model_path}")
-
-            self.model = YOLO(model_path)
-
-            # Move model to appropriate device
-            if self.device != "cpu":
-                self.model.to(self.device)
+            self.model = load_yolo_model(model_path, self.device)
 
             logger.info(f"Model loaded successfully on device: {self.device}")
 
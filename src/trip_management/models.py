@@ -5,13 +5,18 @@ Defines data structures for trip management, status tracking,
 and event logging.
 """
 
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel, Field
 from dataclasses import dataclass
 
 
+def utc_now() -> datetime:
+    """Current time as a timezone-aware UTC datetime."""
+    return datetime.now(timezone.utc)
+
+
 class TripStatus(str, Enum):
     """Trip status enumeration."""
     NOT_STARTED = "not_started"
@@ -56,7 +61,7 @@ class Trip(BaseModel):
     status: TripStatus = Field(default=TripStatus.NOT_STARTED, description="Current trip status")
 
     # Timing
-    start_time: Optional[datetime] = Field(default_factory=datetime.now, description="Trip start timestamp")
+    start_time: Optional[datetime] = Field(default_factory=utc_now, description="Trip start timestamp")
     end_time: Optional[datetime] = Field(None, description="Trip end timestamp")
     duration_seconds: Optional[int] = Field(None, description="Trip duration in seconds")
 
@@ -106,7 +111,7 @@ class Trip(BaseModel):
             event_id=str(uuid.uuid4()),
             trip_id=self.trip_id,
             event_type=event_type,
-            timestamp=datetime.now(),
+            timestamp=utc_now(),
             passenger_count=self.current_passenger_count,
             metadata=metadata or {}
         )
@@ -136,6 +141,47 @@ class Trip(BaseModel):
         else:
             self.is_overloaded = False
 
+    def update_passenger_counts(self, counts: List[int]):
+        """
+        Apply several passenger count readings in order.
+
+        Equivalent to calling update_passenger_count for each reading, but
+        statistics are updated once and overload events share one timestamp.
+
+        Args:
+            counts: Passenger counts, oldest first
+        """
+        if not counts:
+            return
+
+        import uuid
+
+        now = utc_now()
+        new_events = []
+
+        for count in counts:
+            if count > self.max_capacity:
+                if not self.is_overloaded:
+                    self.is_overloaded = True
+                    self.overload_events += 1
+                    new_events.append(TripEvent(
+                        event_id=str(uuid.uuid4()),
+                        trip_id=self.trip_id,
+                        event_type=EventType.OVERLOAD_DETECTED,
+                        timestamp=now,
+                        passenger_count=count,
+                        metadata={
+                            "passenger_count": count,
+                            "max_capacity": self.max_capacity
+                        }
+                    ))
+            else:
+                self.is_overloaded = False
+
+        self.current_passenger_count = counts[-1]
+        self.max_passenger_count = max(self.max_passenger_count, max(counts))
+        self.events.extend(new_events)
+
     def get_duration(self) -> Optional[int]:
         """
         Get trip duration in seconds.
@@ -146,7 +192,7 @@ class Trip(BaseModel):
         if self.start_time and self.end_time:
             return int((self.end_time - self.start_time).total_seconds())
         elif self.start_time:
-            return int((datetime.now() - self.start_time).total_seconds())
+            return int((utc_now() - self.start_time).total_seconds())
         return None
 
     def to_summary(self) -> Dict[str, Any]:
@@ -174,9 +220,24 @@ class Trip(BaseModel):
             "sync_status": self.sync_status
         }
 
+    def serialize_events(self) -> bytes:
+        """
+        Serialize all trip events to JSON in one call.
+
+        Event timestamps, including datetimes in metadata, are kept as
+        datetime objects until here and formatted by orjson. Trip and
+        event timestamps are UTC, so they carry a +00:00 offset.
+
+        Returns:
+            bytes: JSON array of events
+        """
+        import orjson
+
+        return orjson.dumps([event.model_dump() for event in self.events])
+
     def end_trip(self):
         """End the trip and set final status."""
-        self.end_time = datetime.now()
+        self.end_time = utc_now()
         self.status = TripStatus.COMPLETED
 
     def get_duration_minutes(self) -> Optional[float]:
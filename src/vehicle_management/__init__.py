@@ -6,7 +6,6 @@ for the taxi passenger counting system.
 """
 
 from .models import Vehicle, VehicleStatus, CameraType, FootageRecord
-from .footage_manager import FootageManager
 
 __all__ = [
     "Vehicle",
@@ -15,3 +14,12 @@ __all__ = [
     "FootageRecord",
     "FootageManager"
 ]
+
+
+def __getattr__(name):
+    # FootageManager pulls in OpenCV; import it only when it is asked for so
+    # the models stay usable without cv2 installed
+    if name == "FootageManager":
+        from .footage_manager import FootageManager
+        return FootageManager
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")